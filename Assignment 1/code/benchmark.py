@@ -0,0 +1,615 @@
+import argparse
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from queue import PriorityQueue
+import tracemalloc
+import numpy as np
+from compact import RELAY_MODES
+from engine import Engine
+from scheduler import CalendarQueue , Event , EventKind , EventQueue , SCHEDULERS
+from structures import Block , BlockBody , IdAllocator , Peer , RandomPool , Transaction
+from graph import graph_connected , graph_creation
+from topology import LinkTable , TOPOLOGIES
+from simulator import Config , run_simulation
+from orphans import add_back , cache_orphans , check_orphans , orphan_chains
+from results import write_results
+from utility import *
+
+# Benchmarks for the building blocks of the simulator
+# Usage: python benchmark.py <benchmark> [options]
+
+
+# Grows the blockchain of a single Peer one block at a time, doing the same lookups as a received_block task
+# (duplicate check, parent depth, validation against the parent balances), and reports the average cost per
+# block over windows of the chain length. With the block index this should stay flat as the chain grows.
+
+def bench_blockstore(args):
+
+    block_ids=IdAllocator(1)
+    transaction_ids=IdAllocator(0)
+
+    peer=Peer(0,'fast','highcpu',1.0)
+
+    transactions=[Transaction(-1,i,MININGFEE,8000,transaction_ids()) for i in range(args.peers)]
+    genesis_block=Block(BlockBody(-1,0,-1,transactions,[MININGFEE for i in range(args.peers)]),-1,0,0)
+    add_block(peer,genesis_block)
+
+    prev_block=genesis_block
+    start=time.perf_counter()
+
+    print("Chain length | Time per block (us)")
+
+    for i in range(1,args.blocks+1):
+
+        block=Block(BlockBody(prev_block.blk_id,block_ids(),1,[Transaction(-1,1,MININGFEE,8000,transaction_ids())]),0,0,i)
+
+        # Same sequence of lookups done in simulator.py for every received block
+        if find_block_depth(block.blk_id,peer) != -1:
+            continue
+        block.depth=find_block_depth(block.prev_blk_id,peer)+1
+        validate(block,peer)
+        add_block(peer,block)
+
+        prev_block=block
+
+        if i%args.window==0:
+            end=time.perf_counter()
+            print(f"{i:12d} | {(end-start)*10**6/args.window:.2f}")
+            start=time.perf_counter()
+
+
+# Builds the same blockchain for every Peer of a network and compares the memory used with the balances
+# of all Peers stored in every block (i.e. a checkpoint in every block) against the current layout
+# (a checkpoint every CHECKPOINT_INTERVAL blocks and the balances cached at the tip of every Peer)
+
+def ledger_memory(chain,genesis_transactions,peers,interval):
+
+    tracemalloc.start()
+    genesis_block=Block(BlockBody(-1,0,-1,genesis_transactions,[MININGFEE for i in range(peers)]),-1,0,0)
+    bodies=[BlockBody(prev_blk_id,blk_id,1,transactions) for prev_blk_id,blk_id,transactions in chain]
+    peer_list=[Peer(j,'fast','highcpu',1.0) for j in range(peers)]
+    for peer in peer_list:
+        add_block(peer,genesis_block)
+        for depth,body in enumerate(bodies,1):
+            block=Block(body,peer.id,depth,depth)
+            validate(block,peer,interval)
+            add_block(peer,block)
+    size=tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return size
+
+def bench_ledger(args):
+
+    block_ids=IdAllocator(1)
+    transaction_ids=IdAllocator(0)
+
+    # Pre-generating the chain, so that the transactions are shared by both layouts and not measured
+    rng=np.random.default_rng(args.seed)
+    chain=[]
+    prev_blk_id=0
+    for i in range(1,args.blocks+1):
+        transactions=[Transaction(rng.integers(args.peers),rng.integers(args.peers),rng.random()*0.01,8000,transaction_ids()) for j in range(args.transactions)]
+        transactions.append(Transaction(-1,rng.integers(args.peers),MININGFEE,8000,transaction_ids()))
+        chain.append((prev_blk_id,block_ids(),transactions))
+        prev_blk_id=chain[-1][1]
+
+    genesis_transactions=[Transaction(-1,i,MININGFEE,8000,transaction_ids()) for i in range(args.peers)]
+
+    interval=CHECKPOINT_INTERVAL
+    full_size=ledger_memory(chain,genesis_transactions,args.peers,1)
+    delta_size=ledger_memory(chain,genesis_transactions,args.peers,interval)
+
+    # Both include the Peer and Block objects, block indexes and transaction sets, which are the same in both layouts
+    print(f"Peers: {args.peers}, Blocks: {args.blocks}, Transactions per block: {args.transactions+1}")
+    print(f"Full balances in every block: {full_size/2**20:.2f} MiB")
+    print(f"Checkpoint every {interval} blocks and tip cache: {delta_size/2**20:.2f} MiB")
+    print(f"Saved: {(full_size-delta_size)/2**20:.2f} MiB")
+
+# Creates a number of transactions, as transaction_generation does, and reports the number of objects
+# and the number of bytes allocated per transaction (including its ID, but not the coin amount)
+# Note that small integer IDs are cached by Python, so only IDs of 256 and above allocate memory
+
+def bench_transactions(args):
+
+    transaction_ids=IdAllocator(0)
+
+    gc.collect()
+    objects=len(gc.get_objects())
+
+    tracemalloc.start()
+    transactions=[Transaction(0,1,1.0,8000,transaction_ids()) for i in range(args.transactions)]
+    size=tracemalloc.get_traced_memory()[0]-sys.getsizeof(transactions)
+    tracemalloc.stop()
+
+    # Only objects tracked by the garbage collector are counted, i.e. the Transaction objects and their __dict__s (if any)
+    objects=len(gc.get_objects())-objects-1
+
+    print(f"Transactions: {args.transactions}")
+    print(f"Tracked objects per transaction: {objects/args.transactions:.2f}")
+    print(f"Bytes per transaction: {size/args.transactions:.1f}")
+
+
+# Latency of a single message as computed by the simulator before the link table, with one propagation delay rho for all links
+
+def latency(start,dest,size,rho,rng):
+    c=5000
+    if(start.speed=='fast' and dest.speed=='fast'):
+        c=100000
+    d = rng.exponential(scale=96/c)
+    return rho+((size)/c)*1000+d
+
+# Computes the latency of a number of messages between two Peers, drawing the queuing delay directly from
+# the numpy Generator (one scalar call per message) and from a RandomPool (batches), and reports messages per second
+
+def bench_variates(args):
+
+    start_peer=Peer(0,'fast','highcpu',1.0)
+    dest_peer=Peer(1,'fast','highcpu',1.0)
+
+    print("Random source | Messages per second")
+
+    for name,rng in [('Generator',np.random.default_rng(args.seed)),('RandomPool',RandomPool(np.random.default_rng(args.seed),args.batch))]:
+        start=time.perf_counter()
+        for i in range(args.messages):
+            latency(start_peer,dest_peer,8000,100,rng)
+        end=time.perf_counter()
+        print(f"{name:13s} | {args.messages/(end-start):.0f}")
+
+
+# Computes the delays of a message from random peers to all their neighbors, one message at a time with latency and
+# for all neighbors at once with the LinkTable, and reports peers (fan-outs) per second
+
+def bench_links(args):
+
+    rng=RandomPool(np.random.default_rng(args.seed))
+    network=TOPOLOGIES[args.topology](args.peers,rng)
+    peer_list=[Peer(i,'fast' if rng.random()<0.5 else 'slow','highcpu',1.0) for i in range(args.peers)]
+    for i in range(args.peers):
+        peer_list[i].neighbors=network.neighbors(i).tolist()
+    links=LinkTable(network,peer_list,rng)
+    sources=[rng.integers(args.peers) for i in range(args.messages)]
+
+    print(f"Peers: {args.peers}, Topology: {args.topology}, Mean degree: {len(network.indices)/args.peers:.2f}")
+    print("Delays | Fan-outs per second")
+
+    start=time.perf_counter()
+    for i in sources:
+        peer=peer_list[i]
+        for adjacent in peer.neighbors:
+            latency(peer,peer_list[adjacent],8000,100,rng)
+    end=time.perf_counter()
+    print(f"{'scalar':6s} | {args.messages/(end-start):.0f}")
+
+    start=time.perf_counter()
+    for i in sources:
+        links.delays(i,8000,rng)
+    end=time.perf_counter()
+    print(f"{'table':6s} | {args.messages/(end-start):.0f}")
+
+# Runs the "hold" model on an event queue: the queue is filled with a number of pending events, then the
+# earliest event is repeatedly taken out and a new one is scheduled at a random time after it, as every task of the
+# simulator does. Compares a PriorityQueue of lists (the old task list) against the EventQueue, in events per second
+
+def hold(task_list,make_task,time_of,pending,events,rng):
+
+    for i in range(pending):
+        task_list.put(make_task(rng.exponential(1000),i%100))
+
+    start=time.perf_counter()
+    for i in range(events):
+        task=task_list.get()
+        task_list.put(make_task(time_of(task)+rng.exponential(1000),i%100))
+    end=time.perf_counter()
+
+    return events/(end-start)
+
+def bench_scheduler(args):
+
+    transaction=Transaction(0,1,1.0,8000,0)
+
+    print(f"Pending events: {args.pending}, Events: {args.events}")
+    print("Event queue    | Events per second")
+
+    queues=[('PriorityQueue',PriorityQueue(),lambda time,peer:[time,peer,'received_transaction',0,transaction],lambda task:task[0]),
+            ('EventQueue',EventQueue(),lambda time,peer:Event(time,peer,EventKind.RECEIVED_TRANSACTION,0,transaction),lambda task:task.time)]
+
+    for name,task_list,make_task,time_of in queues:
+        rng=RandomPool(np.random.default_rng(args.seed))
+        print(f"{name:14s} | {hold(task_list,make_task,time_of,args.pending,args.events,rng):.0f}")
+
+
+# Runs the hold model on the binary heap (EventQueue) and on the calendar queue for each number of pending events
+# Filling the queue is not measured, 10^7 pending events need a few GiB of memory
+
+def bench_calendar(args):
+
+    transaction=Transaction(0,1,1.0,8000,0)
+    make_task=lambda time,peer:Event(time,peer,EventKind.RECEIVED_TRANSACTION,0,transaction)
+
+    print(f"Events: {args.events}")
+    print("Pending events | Heap (events/s) | Calendar (events/s)")
+
+    for pending in args.pending:
+        rates=[]
+        for queue in [EventQueue,CalendarQueue]:
+            task_list=queue()
+            rng=RandomPool(np.random.default_rng(args.seed))
+            rates.append(hold(task_list,make_task,lambda task:task.time,pending,args.events,rng))
+            del task_list
+            gc.collect()
+        print(f"{pending:14d} | {rates[0]:15.0f} | {rates[1]:.0f}")
+
+
+# Relays transactions from random peers to all their neighbors through the Engine, as Simulation.relay does, adding the new
+# tasks to the event queue one at a time with put and all at once with put_many, and reports fan-outs per second for each
+# scheduler. Every fan-out takes out of the queue as many events as it adds, so that the number of pending events stays the same
+
+def bench_fanout(args):
+
+    rng=RandomPool(np.random.default_rng(args.seed))
+    network=TOPOLOGIES[args.topology](args.peers,rng)
+    peer_list=[Peer(i,'fast' if rng.random()<0.5 else 'slow','highcpu',1.0) for i in range(args.peers)]
+    for i in range(args.peers):
+        peer_list[i].neighbors=network.neighbors(i).tolist()
+    links=LinkTable(network,peer_list,rng)
+    sources=[rng.integers(args.peers) for i in range(args.messages)]
+    transaction=Transaction(0,1,1.0,8000,0)
+
+    print(f"Peers: {args.peers}, Topology: {args.topology}, Pending events: {args.pending}")
+    print("Scheduler | put (fan-outs/s) | put_many (fan-outs/s)")
+
+    for name,queue in SCHEDULERS.items():
+        rates=[]
+        for bulk in [False,True]:
+            rng=RandomPool(np.random.default_rng(args.seed))
+            engine=Engine(queue())
+            task_list=engine.task_list
+            for i in range(args.pending):
+                engine.put(Event(rng.exponential(1000),i%args.peers,EventKind.RECEIVED_TRANSACTION,0,transaction))
+
+            start=time.perf_counter()
+            for i in sources:
+                task=task_list.get()
+                ntasks=broadcast((Event(task.time,i,EventKind.RECEIVED_TRANSACTION,i,transaction),),peer_list[i],-1,links,rng)
+                for k in range(len(ntasks)-1):
+                    task_list.get()
+                if bulk:
+                    engine.put_many(ntasks)
+                else:
+                    for ntask in ntasks:
+                        engine.put(ntask)
+            end=time.perf_counter()
+            rates.append(args.messages/(end-start))
+        print(f"{name:9s} | {rates[0]:16.0f} | {rates[1]:.0f}")
+
+
+# Stress test of out of order blocks with the chains of orphans.py: reports the time to cache the orphans and to add
+# them back once the first blocks arrive, then checks that every chain was added back. The recursion limit is not
+# raised, so a chain deeper than it is only resolved if adding cached blocks does not recurse.
+
+def bench_orphans(args):
+
+    peer,chains=orphan_chains(args.peers,args.chains,args.depth)
+
+    print(f"Chains: {args.chains}, Depth: {args.depth}, Recursion limit: {sys.getrecursionlimit()}")
+
+    start=time.perf_counter()
+    cache_orphans(peer,chains)
+    end=time.perf_counter()
+    print(f"Caching {len(peer.cached_blocks)} orphans: {end-start:.3f} s")
+
+    start=time.perf_counter()
+    add_back(peer,chains)
+    end=time.perf_counter()
+    check_orphans(peer,chains)
+    print(f"Adding back: {end-start:.3f} s, Blocks: {len(peer.received_blocks)}, Max depth: {peer.max_depth}, Left in cache: {len(peer.cached_blocks)}")
+
+# Random graph builder of graph.py before it was connected by construction, for bench_graph: every node picks a
+# degree between 4 and 8 and is connected to random later nodes which are not saturated, and the graph is created
+# again till it is connected
+
+def retry_graph_creation(peers,rng):
+
+    degree=[0 for i in range(peers)]
+    edges=[[] for i in range(peers)]
+    saturated=[]
+
+    for i in range(peers):
+        num=rng.choice([4,5,6,7,8])
+        if num<=degree[i]:
+            continue
+        potential_neighbors=list(set(range(i+1,peers))-set(saturated))
+        neighbors = rng.choice(potential_neighbors,min(len(potential_neighbors),num-degree[i]),replace=False)
+        for ele in neighbors:
+            edges[i].append(ele)
+            edges[ele].append(i)
+            degree[i]+=1
+            degree[ele]+=1
+            if(degree[ele]==8):
+                saturated.append(ele)
+
+    return edges
+
+# Time to build the network of the simulator with the previous builder (retrying till connected) and with graph_creation
+# The previous builder is quadratic in the number of peers, so it is skipped above --maxretry peers
+
+def bench_graph(args):
+
+    print(" Peers | Retry builder (s) | Attempts | Builder (s) | Connectivity check (s) | Min/Max degree")
+
+    for peers in args.peers:
+        rng=np.random.default_rng(args.seed)
+
+        if peers<=args.maxretry:
+            start=time.perf_counter()
+            attempts=1
+            edges=retry_graph_creation(peers,rng)
+            while(not graph_connected(edges,peers)):
+                edges=retry_graph_creation(peers,rng)
+                attempts+=1
+            retry=f"{time.perf_counter()-start:17.3f} | {attempts:8d}"
+        else:
+            retry=f"{'skipped':>17s} | {'-':>8s}"
+
+        start=time.perf_counter()
+        edges=graph_creation(peers,rng)
+        middle=time.perf_counter()
+        connected=graph_connected(edges,peers)
+        end=time.perf_counter()
+
+        degrees=[len(neighbors) for neighbors in edges]
+        print(f"{peers:6d} | {retry} | {middle-start:11.3f} | {end-middle:22.3f} | {min(degrees)}/{max(degrees)}{'' if connected else ' (not connected)'}")
+
+# Returns the command running simulator.py with the parameters of a benchmark
+
+def simulator_command(args):
+    return [sys.executable,os.path.join(os.path.dirname(os.path.abspath(__file__)),'simulator.py'),'--peers',str(args.peers),'--slow',str(args.slow),'--lowcpu',str(args.lowcpu),
+            '--meantransactiontime',str(args.meantransactiontime),'--meanblocktime',str(args.meanblocktime)]
+
+# Runs a command in a temporary directory, so that the output files of the simulator are cleaned up, and returns
+# the exit code and the time taken. The output of the simulator is discarded
+
+def run_simulator(command):
+    with tempfile.TemporaryDirectory() as directory:
+        start=time.perf_counter()
+        result=subprocess.run(command,cwd=directory,stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL)
+        end=time.perf_counter()
+    return result.returncode,end-start
+
+# Runs simulator.py in a separate process with the given parameters and reports its peak resident set size
+
+def bench_rss(args):
+
+    returncode,elapsed=run_simulator(simulator_command(args))
+
+    # ru_maxrss is in KiB on Linux
+    rss=resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    print(f"Peers: {args.peers}, Exit code: {returncode}, Time: {elapsed:.1f} s")
+    print(f"Peak RSS: {rss/1024:.1f} MiB")
+
+
+# Runs simulator.py with the same seed with and without a binary trace, and reports the cost of writing the trace
+# The runs alternate and the best of the repetitions is taken, as a full run is noisy. The simulator also writes
+# the results file at the end, which is included in both times
+
+def bench_trace(args):
+
+    command=simulator_command(args)+['--seed',str(args.seed),'--maxevents',str(args.events)]
+
+    print(f"Peers: {args.peers}, Events: {args.events}, Best of {args.repeat}")
+    print("Trace | Time (s) | Events per second")
+
+    times=[np.inf,np.inf]
+    for _ in range(args.repeat):
+        for traced in [0,1]:
+            returncode,elapsed=run_simulator(command+(['--trace','run.trace'] if traced else []))
+            times[traced]=min(times[traced],elapsed)
+
+    for traced in [0,1]:
+        print(f"{'on' if traced else 'off':5s} | {times[traced]:8.2f} | {args.events/times[traced]:.0f}")
+
+    print(f"Cost of the trace: {(times[1]-times[0])*100/times[0]:.1f}%")
+
+# Returns the Config of a simulation with the parameters of a benchmark, running for the given simulated time
+
+def simulation_config(args,**options):
+    return Config(args.peers,args.slow,args.lowcpu,args.meantransactiontime,args.meanblocktime,maxevents=10**9,maxtime=args.maxtime,**options)
+
+# Runs the simulation with full and compact block relay for the same simulated time and seeds, and reports the bandwidth
+# used for blocks and the fork rate (fraction of the blocks mined which are not on the longest chain) of both, summed and
+# averaged over the seeds
+
+def bench_relay(args):
+
+    print(f"Peers: {args.peers}, Simulated time: {args.maxtime:.0f} ms, Seeds: {args.seeds}")
+    print("Relay   | Block messages | Sent (kilobits) | Full blocks (kilobits) | Round trips | Fork rate")
+
+    results={}
+    for mode in RELAY_MODES:
+        runs=[run_simulation(simulation_config(args,seed=seed,relay=mode)) for seed in args.seeds]
+        total=lambda field:sum(getattr(result.relay_stats,field) for result in runs)
+        results[mode]=(total('sent_size'),total('full_size'),sum(result.fork_rate() for result in runs)/len(runs))
+        print(f"{mode:7s} | {total('messages'):14d} | {total('sent_size'):15.0f} | {total('full_size'):22.0f} | {total('round_trips'):11d} | {results[mode][2]:.4f}")
+
+    sent,full,compact_forks=results['compact']
+    full_forks=results['full'][2]
+    print(f"Bandwidth saved for blocks: {100*(1-sent/full):.1f}%")
+    print(f"Fork rate: {full_forks:.4f} with full blocks, {compact_forks:.4f} with compact blocks ({compact_forks-full_forks:+.4f})")
+
+# Runs the simulation for the same simulated time and seed with transactions relayed one at a time and batched over each given
+# window, and reports the number of events processed, the time taken and how far transactions have spread at the end
+
+def bench_trickle(args):
+
+    print(f"Peers: {args.peers}, Mean transaction time: {args.meantransactiontime:.0f} ms, Simulated time: {args.maxtime:.0f} ms")
+    print("Window (ms) |  Events | Time (s) | Transactions | Received by a peer on average")
+
+    events=None
+    for window in args.windows:
+        start=time.perf_counter()
+        result=run_simulation(simulation_config(args,seed=args.seed,txwindow=window))
+        end=time.perf_counter()
+        transactions,coverage=result.transaction_coverage()
+        if events is None:
+            events=result.events
+        print(f"{window:11.0f} | {result.events:7d} | {end-start:8.2f} | {transactions:12d} | {100*coverage:.1f}% "
+              f"({100*result.events/events:.0f}% of the events)")
+
+# Writes the blocks received by every peer in a separate text file, as simulator.py did before the results file
+# Kept as the reference for bench_output
+
+def write_details_files(peer_list):
+    for i in range(len(peer_list)):
+        f=open(f"Peer{i}_Block_Details.out",'w')
+        for block in peer_list[i].received_blocks:
+            f.write(str(block.blk_id)+" "+str(block.prev_blk_id)+" "+str(block.time_of_arrival)+"\n")
+        f.close()
+
+# Runs a simulation, then writes the blocks received by every peer as one text file per peer and as the results file,
+# in a temporary directory, and reports the time taken, the number of files and their total size
+
+def bench_output(args):
+
+    result=run_simulation(Config(args.peers,args.slow,args.lowcpu,args.meantransactiontime,args.meanblocktime,seed=args.seed,maxevents=args.events))
+    rows=sum(len(peer.received_blocks) for peer in result.peer_list)
+
+    print(f"Peers: {args.peers}, Events: {result.events}, Rows (blocks received by a peer): {rows}")
+    print("Output       | Time (s) | Files | Size (KiB)")
+
+    for name,write in [('Peer files',lambda:write_details_files(result.peer_list)),('Results.npz',lambda:write_results('Results.npz',result.columns()))]:
+        with tempfile.TemporaryDirectory() as directory:
+            current=os.getcwd()
+            os.chdir(directory)
+            start=time.perf_counter()
+            write()
+            end=time.perf_counter()
+            os.chdir(current)
+            files=os.listdir(directory)
+            size=sum(os.path.getsize(os.path.join(directory,file)) for file in files)
+        print(f"{name:12s} | {end-start:8.3f} | {len(files):5d} | {size/1024:.0f}")
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='benchmark',required=True)
+
+    blockstore = subparsers.add_parser('blockstore', help='cost of processing a received block as the chain grows')
+    blockstore.add_argument("--blocks", help='number of blocks to add to the chain',type=int,default=12000)
+    blockstore.add_argument("--window", help='number of blocks averaged over for each line of output',type=int,default=1000)
+    blockstore.add_argument("--peers", help='number of peers (length of the balances list)',type=int,default=100)
+    blockstore.set_defaults(run=bench_blockstore)
+
+    ledger = subparsers.add_parser('ledger', help='memory used for balances by full copies in every block against checkpoints')
+    ledger.add_argument("--blocks", help='number of blocks in the chain',type=int,default=500)
+    ledger.add_argument("--peers", help='number of peers, each holding the whole chain',type=int,default=100)
+    ledger.add_argument("--transactions", help='number of transactions per block (excluding the coinbase transaction)',type=int,default=10)
+    ledger.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    ledger.set_defaults(run=bench_ledger)
+
+    transactions = subparsers.add_parser('transactions', help='objects and bytes used per transaction')
+    transactions.add_argument("--transactions", help='number of transactions to create',type=int,default=1000000)
+    transactions.set_defaults(run=bench_transactions)
+
+    variates = subparsers.add_parser('variates', help='messages per second in latency with scalar and batched random variates')
+    variates.add_argument("--messages", help='number of messages',type=int,default=1000000)
+    variates.add_argument("--batch", help='batch size of the RandomPool',type=int,default=8192)
+    variates.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    variates.set_defaults(run=bench_variates)
+
+    links = subparsers.add_parser('links', help='fan-outs per second computing the delays to all neighbors of a peer, per message and with the link table')
+    links.add_argument("--peers", help='number of peers',type=int,default=1000)
+    links.add_argument("--topology", help='shape of the network',choices=list(TOPOLOGIES),default='random')
+    links.add_argument("--messages", help='number of fan-outs',type=int,default=200000)
+    links.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    links.set_defaults(run=bench_links)
+
+    scheduler = subparsers.add_parser('scheduler', help='events per second of the event queue against a PriorityQueue of lists')
+    scheduler.add_argument("--pending", help='number of pending events in the queue',type=int,default=10000)
+    scheduler.add_argument("--events", help='number of events processed',type=int,default=1000000)
+    scheduler.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    scheduler.set_defaults(run=bench_scheduler)
+
+    calendar = subparsers.add_parser('calendar', help='events per second of the binary heap against the calendar queue for large numbers of pending events')
+    calendar.add_argument("--pending", help='numbers of pending events in the queue',type=int,nargs='+',default=[10**5,10**6,10**7])
+    calendar.add_argument("--events", help='number of events processed',type=int,default=1000000)
+    calendar.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    calendar.set_defaults(run=bench_calendar)
+
+    fanout = subparsers.add_parser('fanout', help='fan-outs per second relaying a message to all neighbors, adding the new events one at a time and at once')
+    fanout.add_argument("--peers", help='number of peers',type=int,default=1000)
+    fanout.add_argument("--topology", help='shape of the network',choices=list(TOPOLOGIES),default='random')
+    fanout.add_argument("--pending", help='number of pending events in the queue',type=int,default=10000)
+    fanout.add_argument("--messages", help='number of fan-outs',type=int,default=200000)
+    fanout.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    fanout.set_defaults(run=bench_fanout)
+
+    orphans = subparsers.add_parser('orphans', help='time to cache deep chains of out of order blocks and to add them back')
+    orphans.add_argument("--depth", help='number of blocks in every chain',type=int,default=100000)
+    orphans.add_argument("--chains", help='number of chains built on the genesis block',type=int,default=4)
+    orphans.add_argument("--peers", help='number of peers (length of the balances list)',type=int,default=100)
+    orphans.set_defaults(run=bench_orphans)
+
+    graph = subparsers.add_parser('graph', help='time to build the network with the previous retrying builder and with graph_creation')
+    graph.add_argument("--peers", help='numbers of peers',type=int,nargs='+',default=[1000,10000,100000])
+    graph.add_argument("--maxretry", help='largest number of peers built with the retrying builder',type=int,default=10000)
+    graph.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    graph.set_defaults(run=bench_graph)
+
+    rss = subparsers.add_parser('rss', help='peak resident set size of a full simulator run')
+    rss.add_argument("--peers", help='number of peers',type=int,default=500)
+    rss.add_argument("--slow", help='percentage of slow nodes',type=float,default=50)
+    rss.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float,default=50)
+    rss.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float,default=5000)
+    rss.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float,default=1000)
+    rss.set_defaults(run=bench_rss)
+
+    trace = subparsers.add_parser('trace', help='cost of writing the binary trace in a full simulator run')
+    trace.add_argument("--peers", help='number of peers',type=int,default=100)
+    trace.add_argument("--slow", help='percentage of slow nodes',type=float,default=50)
+    trace.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float,default=50)
+    trace.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float,default=500)
+    trace.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float,default=2000)
+    trace.add_argument("--events", help='number of events processed',type=int,default=500000)
+    trace.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    trace.add_argument("--repeat", help='number of runs with and without the trace',type=int,default=3)
+    trace.set_defaults(run=bench_trace)
+
+    relay = subparsers.add_parser('relay', help='bandwidth used for blocks and fork rate with full and compact block relay')
+    relay.add_argument("--peers", help='number of peers',type=int,default=50)
+    relay.add_argument("--slow", help='percentage of slow nodes',type=float,default=50)
+    relay.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float,default=50)
+    relay.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float,default=2000)
+    relay.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float,default=5000)
+    relay.add_argument("--maxtime", help='simulated time of every run in ms',type=float,default=200000)
+    relay.add_argument("--seeds", help='seeds of the runs with each relay mode',type=int,nargs='+',default=[0,1,2])
+    relay.set_defaults(run=bench_relay)
+
+    trickle = subparsers.add_parser('trickle', help='events processed in a full simulator run with transactions relayed one at a time and in batches')
+    trickle.add_argument("--peers", help='number of peers',type=int,default=50)
+    trickle.add_argument("--slow", help='percentage of slow nodes',type=float,default=50)
+    trickle.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float,default=50)
+    trickle.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float,default=500)
+    trickle.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float,default=10000)
+    trickle.add_argument("--maxtime", help='simulated time of every run in ms',type=float,default=60000)
+    trickle.add_argument("--windows", help='windows in ms over which transactions are batched, 0 relays each at once',type=float,nargs='+',default=[0,100,500,2000])
+    trickle.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    trickle.set_defaults(run=bench_trickle)
+
+    output = subparsers.add_parser('output', help='time and files of writing the blocks received by every peer as text files and as the results file')
+    output.add_argument("--peers", help='number of peers',type=int,default=1000)
+    output.add_argument("--slow", help='percentage of slow nodes',type=float,default=50)
+    output.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float,default=50)
+    output.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float,default=100000)
+    output.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float,default=1000)
+    output.add_argument("--events", help='number of events of the simulation',type=int,default=200000)
+    output.add_argument("--seed", help='seed of the random generator',type=int,default=0)
+    output.set_defaults(run=bench_output)
+
+    args=parser.parse_args()
+    args.run(args)
@@ -0,0 +1,78 @@
+import numpy as np
+from scheduler import Event
+from utility import message_size
+
+
+# Compact block relay (as in BIP 152): instead of the full block, a Peer announces a block to its neighbors with the
+# header and a short ID for every transaction, with the coinbase transactions (which no other Peer can hold) sent in
+# full. A neighbor rebuilds the block from the transactions it has already received, and requests the ones it is
+# missing from the sender, which costs one more round trip over the link
+
+# Ways blocks can be relayed, full blocks (default) or compact blocks
+RELAY_MODES = ['full','compact']
+
+# Sizes of the parts of a compact block message, in the units of message_size (a transaction of 1 KB is 8000)
+HEADER_SIZE = 640                                   # Block header (80 bytes)
+SHORT_ID_SIZE = 48                                  # Short ID of a transaction (6 bytes)
+REQUEST_SIZE = 256                                  # Request for missing transactions, the block hash (32 bytes)
+INDEX_SIZE = 16                                     # Index of a missing transaction in the request (2 bytes)
+
+# Counts of the block messages sent in a simulation, and of what relaying all of them as full blocks would have cost
+
+class RelayStats:
+    __slots__=('mode','messages','full_size','sent_size','round_trips')
+
+    def __init__(self,mode):
+        self.mode=mode                              # Way blocks are relayed (one of RELAY_MODES)
+        self.messages=0                             # Number of block messages sent from a Peer to a neighbor
+        self.full_size=0                            # Total size of those messages as full blocks
+        self.sent_size=0                            # Total size actually sent, with requests and missing transactions for compact blocks
+        self.round_trips=0                          # Number of compact block messages whose receiver had to request missing transactions
+
+    # Records block messages sent to a number of neighbors
+    def record(self,messages,full_size,sent_size,round_trips):
+        self.messages+=messages
+        self.full_size+=full_size
+        self.sent_size+=sent_size
+        self.round_trips+=round_trips
+
+    # Returns a one line summary, with the fraction of the blocks mined which are not on the longest chain
+    def summary(self,fork_rate):
+        saved=100*(1-self.sent_size/self.full_size) if self.full_size else 0.0
+        return (f"Relay: {self.mode}, Block messages: {self.messages}, Sent: {self.sent_size:.0f} kilobits, Full blocks: {self.full_size:.0f} kilobits "
+                f"({saved:.1f}% saved), Round trips: {self.round_trips}, Fork rate: {fork_rate:.4f}")
+
+# Broadcasts the given received_block tasks (in order) from Peer object start to all its neighbors except sender as compact blocks,
+# in the same way as broadcast. The transactions a neighbor is missing are the ones it has not received when the block is sent,
+# and they are fetched from start over the same link. Records the messages in stats (RelayStats)
+
+def compact_broadcast(tasks,start,sender,links,peer_list,stats,rng):
+
+    start_id=start.id
+    neighbors=start.neighbors
+    receivers=np.array([dest!=sender for dest in neighbors])
+    events=[]
+
+    for task in tasks:
+        transactions=task.obj.transactions
+        prefilled=[transaction.size for transaction in transactions if transaction.start==-1]
+        shared=[transaction for transaction in transactions if transaction.start!=-1]
+        size=HEADER_SIZE+SHORT_ID_SIZE*len(shared)+sum(prefilled)
+
+        # Number and total size of the transactions of the block that every neighbor is missing
+        absent=[[transaction.size for transaction in shared if transaction.transaction_id not in peer_list[dest].seen_transactions] for dest in neighbors]
+        count=np.array([len(sizes) for sizes in absent],dtype=np.float64)
+        missing=np.array([sum(sizes) for sizes in absent],dtype=np.float64)
+        request=np.where(count>0,REQUEST_SIZE+INDEX_SIZE*count,0)
+
+        delays=links.compact_delays(start_id,size,request,missing,rng)
+
+        sent=int(receivers.sum())
+        stats.record(sent,sent*message_size(task),sent*size+float((request+missing)[receivers].sum()),int((count[receivers]>0).sum()))
+
+        current_time=task.time
+        kind=task.kind
+        obj=task.obj
+        events.extend([Event(current_time+delay,dest,kind,start_id,obj) for dest,delay in zip(neighbors,delays) if dest!=sender])
+
+    return events
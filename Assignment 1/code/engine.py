@@ -0,0 +1,84 @@
+from scheduler import EventKind
+
+
+# Discrete event simulation engine
+# Takes events out of the event queue in order of time and dispatches each to the handler registered for its kind,
+# calling the registered hooks before and after every event. This is the only loop over events of the simulator
+
+class Engine:
+    __slots__=('task_list','handlers','before','after','count','time','stopped')
+
+    def __init__(self,task_list):
+        self.task_list=task_list                    # Event queue (EventQueue or CalendarQueue)
+        self.handlers=[None for kind in EventKind]  # Handler for every kind of event, indexed by EventKind
+        self.before=[]                              # Hooks called with every event before it is handled
+        self.after=[]                               # Hooks called with every event after it is handled
+        self.count=0                                # Number of events processed till now
+        self.time=0                                 # Time of the last event processed
+        self.stopped=False                          # Set by stop() to end the current run
+
+    # Registers the handler for a kind of event, handler is called with the event
+    def register(self,kind,handler):
+        self.handlers[kind]=handler
+
+    # Registers a hook called with every event before it is handled
+    def register_before(self,hook):
+        self.before.append(hook)
+
+    # Registers a hook called with every event after it is handled
+    def register_after(self,hook):
+        self.after.append(hook)
+
+    # Schedules an event
+    def put(self,task):
+        self.task_list.put(task)
+
+    # Schedules a list of events at once, in the same order as put on each of them
+    def put_many(self,tasks):
+        self.task_list.put_many(tasks)
+
+    # Stops the current run after the event being handled
+    def stop(self):
+        self.stopped=True
+
+    # Processes events till the event queue is empty or stop() is called
+    # If given, stops after max_events events, or before the first event later than max_time (which is left in the queue)
+    def run(self,max_events=None,max_time=None):
+
+        task_list=self.task_list
+        handlers=self.handlers
+        before=self.before
+        after=self.after
+
+        self.stopped=False
+        processed=0
+
+        while not task_list.empty() and not self.stopped:
+
+            if max_events is not None and processed>=max_events:
+                break
+
+            # Get earliest scheduled task in task list
+            task=task_list.get()
+
+            if max_time is not None and task.time>max_time:
+                task_list.put(task)
+                break
+
+            handler=handlers[task.kind]
+            if handler is None:
+                print("ERROR : INVALID TASK TYPE")
+                break
+
+            self.time=task.time
+
+            for hook in before:
+                hook(task)
+
+            handler(task)
+
+            for hook in after:
+                hook(task)
+
+            self.count+=1
+            processed+=1
@@ -0,0 +1,51 @@
+import json
+from scheduler import EVENT_NAMES , EventKind
+
+
+# Levels of the event log, each level also logs everything of the levels below it
+
+OFF = 0     # Nothing is logged (default), logging then costs one comparison per call site
+BLOCK = 1   # Blocks accepted by Peers and blocks which are dropped as invalid
+EVENT = 2   # Every event processed
+DEBUG = 3   # Every event scheduled, and the transaction IDs of every accepted block
+
+LEVELS = {'off':OFF,'block':BLOCK,'event':EVENT,'debug':DEBUG}
+
+# Structured log of the simulation, one JSON object per line (JSONL)
+# Callers check the level before building a record, so that nothing is formatted when the level is lower
+
+class EventLog:
+    __slots__=('level','file')
+
+    def __init__(self,level=OFF,path=None):
+        self.level=level                            # Level of the log (one of LEVELS)
+        self.file=open(path,'w') if level>OFF else None # File the records are written to, only opened if logging is on
+
+    # Writes a record (dict) as one line of JSON
+    def write(self,record):
+        self.file.write(json.dumps(record,separators=(',',':')))
+        self.file.write('\n')
+
+    # Writes a record of a given type for an event
+    def event(self,record_type,task):
+        if task.kind==EventKind.GEN_BLOCK or task.kind==EventKind.RECEIVED_BLOCK:
+            obj_id=task.obj.blk_id
+        elif task.kind==EventKind.RECEIVED_TRANSACTIONS:
+            obj_id=[transaction.transaction_id for transaction in task.obj]
+        elif task.kind==EventKind.RELAY_TRANSACTIONS:
+            obj_id=None
+        else:
+            obj_id=task.obj.transaction_id
+        self.write({'type':record_type,'time':task.time,'peer':task.peer,'kind':EVENT_NAMES[task.kind],'sender':task.sender,'id':obj_id})
+
+    # Writes a record of a given type for a block of a given Peer at a given time
+    def block(self,record_type,current_time,peer_id,block):
+        record={'type':record_type,'time':current_time,'peer':peer_id,'blk_id':block.blk_id,'prev_blk_id':block.prev_blk_id,
+                'miner_id':block.miner_id,'depth':block.depth,'transactions':len(block.transactions)}
+        if self.level>=DEBUG:
+            record['transaction_ids']=[transaction.transaction_id for transaction in block.transactions]
+        self.write(record)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
@@ -0,0 +1,104 @@
+import argparse
+import numpy as np
+from eventtrace import ACCEPTED , read_trace
+from scheduler import EVENT_NAMES
+from visualize import show
+
+# Inspection of a binary trace written by simulator.py --trace, without re-running the simulation
+# Rebuilds the block tree of a Peer as it was at any simulated time
+
+
+# Returns the records of the blocks accepted by a given Peer till a given time, in order of acceptance
+
+def accepted_blocks(records,peer,time):
+    return records[(records['kind']==ACCEPTED)&(records['peer']==peer)&(records['time']<=time)]
+
+# Returns the records of the events processed by a given Peer till a given time
+
+def processed_events(records,peer,time):
+    return records[(records['kind']!=ACCEPTED)&(records['peer']==peer)&(records['time']<=time)]
+
+# Builds the block tree from the records of accepted blocks
+# Returns the children of every block, the depth of every block and the block to be mined upon
+# (maximum depth, earliest accepted on a tie, as in the simulator)
+
+def build_tree(blocks):
+
+    children={}
+    depth={}
+    tip=None
+
+    for record in blocks:
+        blk_id=int(record['obj'])
+        parent=int(record['parent'])
+        children.setdefault(parent,[]).append(blk_id)
+        depth[blk_id]=depth[parent]+1 if parent in depth else 0
+        if tip is None or depth[blk_id]>depth[tip]:
+            tip=blk_id
+
+    return children,depth,tip
+
+# Prints the block tree, every block indented by its depth, blocks on the longest chain marked with a *
+
+def print_tree(blocks,children,depth,tip):
+
+    info={int(record['obj']):record for record in blocks}
+
+    # Blocks on the chain from the genesis block to the block to be mined upon
+    chain=set()
+    current=tip
+    while current in info:
+        chain.add(current)
+        current=int(info[current]['parent'])
+
+    roots=[blk_id for blk_id in info if int(info[blk_id]['parent']) not in info]
+
+    # Iterative depth first traversal, children in order of acceptance
+    stack=list(reversed(roots))
+    while stack:
+        blk_id=stack.pop()
+        record=info[blk_id]
+        mark='*' if blk_id in chain else ' '
+        print(f"{'  '*depth[blk_id]}{mark} {blk_id} (miner {record['sender']}, accepted at {record['time']:.3f})")
+        stack.extend(reversed(children.get(blk_id,[])))
+
+    return chain
+
+# Draws the block tree with Graphviz (visualize.show) into file_name.dot and file_name.pdf
+# The times are the times the blocks were accepted, which for blocks cached till their parent arrived is later than the arrival
+
+def draw_tree(blocks,file_name):
+    show(blocks['obj'].tolist(),blocks['parent'].tolist(),blocks['time'].tolist(),file_name)
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("trace", help='binary trace written by simulator.py --trace')
+    parser.add_argument("--peer", help='ID of the peer whose block tree is rebuilt',type=int,required=True)
+    parser.add_argument("--time", help='simulated time in ms at which the block tree is rebuilt (end of the simulation if not given)',type=float,default=np.inf)
+    parser.add_argument("--events", help='also print the events processed by the peer till the given time',action='store_true')
+    parser.add_argument("--draw", help='draw the block tree with Graphviz into DRAW.dot and DRAW.pdf')
+
+    args=parser.parse_args()
+
+    records=read_trace(args.trace)
+    blocks=accepted_blocks(records,args.peer,args.time)
+
+    if len(blocks)==0:
+        print(f"No blocks accepted by peer {args.peer} till time {args.time}")
+        exit(0)
+
+    if args.events:
+        for record in processed_events(records,args.peer,args.time):
+            print(f"{record['time']:.3f} {EVENT_NAMES[record['kind']]} from {record['sender']} ID {record['obj']}")
+        print()
+
+    children,depth,tip=build_tree(blocks)
+    chain=print_tree(blocks,children,depth,tip)
+
+    print()
+    print(f"Peer {args.peer} at time {min(args.time,float(records['time'].max())):.3f}")
+    print(f"Blocks: {len(blocks)}, Longest chain: {len(chain)} blocks (depth {depth[tip]}), Blocks not in longest chain: {len(blocks)-len(chain)}")
+
+    if args.draw:
+        draw_tree(blocks,args.draw)
@@ -1,49 +1,328 @@
 import argparse
-from queue import PriorityQueue
+from compact import RELAY_MODES , RelayStats , compact_broadcast
+from engine import Engine
+from eventlog import BLOCK , DEBUG , EVENT , EventLog , LEVELS
+from eventtrace import TraceWriter
+from scheduler import Event , EventKind , SCHEDULERS
+from topology import LinkTable , TOPOLOGIES
+from strategy import Honest
 import numpy as np
-import sys
 from graph import *
-from structures import Block , Peer , Transaction
-import uuid
+from structures import Block , BlockBody , IdAllocator , Peer , RandomPool , Transaction
 from utility import *
+from results import result_columns , write_results
 from visualize import *
-from copy import deepcopy
-import faulthandler
 
 # All sizes in kiloBITS, speeds in Kilobits per second, time in milliseconds
 
-faulthandler.enable()
-sys.setrecursionlimit(10**6)
+# State of a running simulation, whose methods are the handlers of the events registered with the Engine
+# Behaviour which differs between Peers is decided by the strategy of each Peer
 
-if __name__=='__main__':
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--peers", help='number of peers',type=int)
-    parser.add_argument("--slow", help='percentage of slow nodes',type=float)
-    parser.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float)
-    parser.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float)
-    parser.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float)
-    
+class Simulation:
+    __slots__=('peer_list','engine','links','rng','meanblocktime','meantransactiontime','log','trace','relay_stats','txwindow','block_ids','transaction_ids','mining')
+
+    def __init__(self,peer_list,engine,links,rng,meanblocktime,meantransactiontime,log,trace,relay_stats,txwindow,block_ids,transaction_ids):
+        self.peer_list=peer_list                    # List of all the Peer objects
+        self.engine=engine                          # Engine processing the events
+        self.links=links                            # Parameters of every link of the network (LinkTable)
+        self.rng=rng                                # Random generator of the simulation
+        self.meanblocktime=meanblocktime            # Mean time between arrival of blocks in ms
+        self.meantransactiontime=meantransactiontime # Mean time between arrival of transactions in ms
+        self.log=log                                # Event log of the simulation
+        self.trace=trace                            # Binary trace of the simulation (TraceWriter), None if not traced
+        self.relay_stats=relay_stats                # Way blocks are relayed and counts of the block messages sent (RelayStats)
+        self.txwindow=txwindow                      # Time in ms new transactions are queued for before being relayed in a batch, 0 relays each at once
+        self.block_ids=block_ids                    # Allocator of the IDs of new blocks (IdAllocator), 0 being the genesis block
+        self.transaction_ids=transaction_ids        # Allocator of the IDs of new transactions (IdAllocator)
+        self.mining=True                            # Whether Peers schedule the generation of a new block after receiving one
+
+        engine.register(EventKind.RECEIVED_BLOCK,self.received_block)
+        engine.register(EventKind.RECEIVED_TRANSACTION,self.received_transaction)
+        engine.register(EventKind.GEN_BLOCK,self.gen_block)
+        engine.register(EventKind.GEN_TRANSACTION,self.gen_transaction)
+        engine.register(EventKind.RELAY_TRANSACTIONS,self.relay_transactions)
+        engine.register(EventKind.RECEIVED_TRANSACTIONS,self.received_transactions)
+        
+        # Every processed event is logged only if the log level asks for it, so that there is no cost otherwise
+        if log.level>=EVENT:
+            engine.register_before(self.log_task)
+        if trace is not None:
+            engine.register_before(trace.event)
+
+    # Broadcasts a list of tasks from a Peer to all its neighbors, except where they are received from
+    # The tasks for all neighbors are added to the event queue at once. Blocks are sent in full or as compact blocks
+    def relay(self,peer,tasks,sender):
+        if not tasks:
+            return
+        if tasks[0].kind!=EventKind.RECEIVED_BLOCK:
+            ntasks=broadcast(tasks,peer,sender,self.links,self.rng)
+        elif self.relay_stats.mode=='compact':
+            ntasks=compact_broadcast(tasks,peer,sender,self.links,self.peer_list,self.relay_stats,self.rng)
+        else:
+            ntasks=broadcast(tasks,peer,sender,self.links,self.rng)
+            size=sum(message_size(ntask) for ntask in ntasks)
+            self.relay_stats.record(len(ntasks),size,size,0)
+        self.engine.put_many(ntasks)
+        if self.log.level>=DEBUG:
+            for ntask in ntasks:
+                self.log.event('scheduled',ntask)
+
+    # Schedules a new task
+    def schedule(self,task):
+        self.engine.put(task)
+        if self.log.level>=DEBUG:
+            self.log.event('scheduled',task)
+
+    # Logs (and traces) a block accepted into the blockchain of a Peer
+    def accepted(self,peer,block,current_time):
+        if self.log.level>=BLOCK:
+            self.log.block('accepted',current_time,peer.id,block)
+        if self.trace is not None:
+            self.trace.accepted(current_time,peer.id,block)
+
+    # Logging every processed task
+    def log_task(self,task):
+        self.log.event('processed',task)
+
+    def received_block(self,task):
+        peer=self.peer_list[task.peer]
+        
+        #If block already reached, skip
+        if find_block_depth(task.obj.blk_id,peer) != -1:
+            return
+        
+        if peer.strategy.ignore_block(peer,task.obj):
+            return
+        
+        # Creating the record of the block for this Peer which will be updated, the body is shared
+        block = Block(task.obj.body,task.peer,task.obj.depth,task.time)
+        
+        # Finding the depth of the parent block
+        parent_depth = find_block_depth(block.prev_blk_id,peer)
+        
+        #If no longer longest chain, drop own block
+        if(block.miner_id==peer.id):
+            if(parent_depth!=peer.max_depth and peer.strategy.drop_stale_block(peer)):
+                return
+        
+        # If parent does not exist, cache block
+        
+        if parent_depth == -1:
+            
+            # Making a copy since we should not modify the original block and then appending to cache
+            taskcopy = task.copy()
+            taskcopy.obj=block
+            
+            # Adding a received block in cache only once
+            if not exists_in_cache(block.blk_id,peer):
+                cache_block(taskcopy,peer)
+
+            return
+        
+        # Updating depth of block
+        block.depth=parent_depth+1
+        
+        # Validate transactions of block and update left_transactions of Peer
+        # If not valid, something has gone wrong and the simulation is stopped
+        if(not validate(block,peer)):
+            if self.log.level>=BLOCK:
+                self.log.block('validation_failed',task.time,peer.id,block)
+            self.engine.stop()
+            return
+        
+        # Updating max depth, list of received blocks and broadcasting to neighbors, as decided by the strategy of the Peer
+        peer.strategy.accept_block(self,peer,task,block,task.time)
+        self.accepted(peer,block,task.time)
+        
+        # Sanity check that owner is correct
+        assert(block.owner==task.peer)
+
+        #Cached blocks can be added back now
+        add_cache(self,peer,block,task.time)
+
+        #Schedule next block generation
+        if self.mining:
+            self.schedule(block_generation(peer,self.meanblocktime,task.time,self.rng,self.block_ids,self.transaction_ids))
+
+    # Adds a transaction (obj) received by a Peer, returns False if it had already been received
+    def new_transaction(self,peer,obj):
+        
+        #If already received, skip rest
+        if exists_transaction(obj.transaction_id,peer) != -1:
+            return False
+        
+        # Create new transaction object for adding into list
+        
+        transaction = Transaction(obj.start,obj.destination,obj.coins,obj.size,obj.transaction_id)
+        
+        # Append to received and left transactions
+        add_transaction(peer,transaction)
+        
+        if(not (exists_transaction_in_blocks(transaction,peer))):
+            peer.left_transactions.add(transaction)
+        
+        return True
     
-    args=parser.parse_args()
-    peers=args.peers #Number of peers
-    slow=args.slow # Percentage of slow peers
-    lowcpu=args.lowcpu # Percentage of lowcpu peers
-    meantransactiontime=args.meantransactiontime # Mean transaction time in ms
-    meanblocktime=args.meanblocktime # Mean block arrival time in ms
+    # Queues a transaction (obj) received from sender for relay to the neighbors of a Peer, the first transaction of a batch
+    # schedules the sending of the batch after txwindow
+    def queue_transaction(self,peer,obj,sender,current_time):
+        if not peer.relay_queue:
+            self.schedule(Event(current_time+self.txwindow,peer.id,EventKind.RELAY_TRANSACTIONS,peer.id,None))
+        peer.relay_queue.append((obj,sender))
+
+    def received_transaction(self,task):
+        peer=self.peer_list[task.peer]
+        
+        if not self.new_transaction(peer,task.obj):
+            return
+        
+        # Broadcast to neighbors except where it is received from, at once or in the next batch
+        if self.txwindow>0:
+            self.queue_transaction(peer,task.obj,task.sender,task.time)
+        else:
+            self.relay(peer,(task,),task.sender)
+
+    def received_transactions(self,task):
+        peer=self.peer_list[task.peer]
+        
+        # New transactions of the batch are relayed in the next batch of the Peer, except to where they are received from
+        for obj in task.obj:
+            if self.new_transaction(peer,obj):
+                self.queue_transaction(peer,obj,task.sender,task.time)
+
+    def relay_transactions(self,task):
+        peer=self.peer_list[task.peer]
+        
+        # Sending the queued transactions to every neighbor in one message
+        ntasks=batch_broadcast(peer.relay_queue,peer,task.time,self.links,self.rng)
+        peer.relay_queue=[]
+        self.engine.put_many(ntasks)
+        if self.log.level>=DEBUG:
+            for ntask in ntasks:
+                self.log.event('scheduled',ntask)
+
+    def gen_block(self,task):
+        peer=self.peer_list[task.peer]
+        
+        #If not longest chain, stop mining
+        if(not peer.strategy.keep_mined_block(peer,task.obj)):
+            return
+        
+        #Validate transaction before receiving, but not update, since updation is done in received_block
+        if(not validate_not_update(task.obj,peer)):
+            # Block should be dropped here! Happens in rare cases!
+            if self.log.level>=BLOCK:
+                self.log.block('dropped',task.time,peer.id,task.obj)
+            return
+        
+        #Add received_block task to use the received_block code
+        # No copy is needed, since the received_block code creates its own record of the block
+        self.schedule(Event(task.time,task.peer,EventKind.RECEIVED_BLOCK,task.peer,task.obj))
+
+    def gen_transaction(self,task):
+        
+        # Add received_transaction task to use the received_transaction code
+        
+        self.schedule(Event(task.time,task.peer,EventKind.RECEIVED_TRANSACTION,task.peer,task.obj))
+        
+        # Add a new transaction generation task to keep the cycle going
+        
+        self.schedule(transaction_generation(self.peer_list[task.peer],self.meantransactiontime,task.time,self.rng,self.transaction_ids))
+
+# Parameters of a simulation, with the same names and defaults as the command line arguments of simulator.py
+# Nothing is written to files unless the event log or the trace is asked for
+
+class Config:
+    __slots__=('peers','slow','lowcpu','meantransactiontime','meanblocktime','seed','scheduler','maxevents','maxtime','loglevel','logfile','topology','trace','relay','txwindow')
+
+    def __init__(self,peers,slow,lowcpu,meantransactiontime,meanblocktime,seed=None,scheduler='heap',maxevents=50000,maxtime=None,loglevel='off',logfile='Events.jsonl',topology='random',trace=None,relay='full',txwindow=0):
+        self.peers=peers                            # Number of peers
+        self.slow=slow                              # Percentage of slow peers
+        self.lowcpu=lowcpu                          # Percentage of lowcpu peers
+        self.meantransactiontime=meantransactiontime # Mean transaction time in ms
+        self.meanblocktime=meanblocktime            # Mean block arrival time in ms
+        self.seed=seed                              # Seed of the random generator, random if None
+        self.scheduler=scheduler                    # Type of event queue (one of SCHEDULERS)
+        self.maxevents=maxevents                    # Number of events to be processed
+        self.maxtime=maxtime                        # Time till which to run the simulation, no limit if None
+        self.loglevel=loglevel                      # Level of the event log (one of LEVELS), nothing is logged by default
+        self.logfile=logfile                        # File the event log is written to
+        self.topology=topology                      # Generator of the network (one of TOPOLOGIES)
+        self.trace=trace                            # File the binary trace is written to, not traced if None
+        self.relay=relay                            # Way blocks are relayed (one of RELAY_MODES)
+        self.txwindow=txwindow                      # Time in ms transactions are batched over before being relayed
+
+# Outcome of a simulation, the Peers with the blocks and transactions they received and the counts of the run
+
+class Result:
+    __slots__=('config','peer_list','relay_stats','events','time')
+
+    def __init__(self,config,peer_list,relay_stats,events,time):
+        self.config=config                          # Config the simulation was run with
+        self.peer_list=peer_list                    # List of all the Peer objects at the end of the simulation
+        self.relay_stats=relay_stats                # Counts of the block messages sent (RelayStats)
+        self.events=events                          # Number of events processed
+        self.time=time                              # Time in ms of the last event processed
+
+    # Returns the fraction of the blocks mined which are not on the longest chain
+    def fork_rate(self):
+        return fork_rate(self.peer_list)
+
+    # Returns the number of transactions created and the fraction of them received by a peer on average
+    def transaction_coverage(self):
+        return transaction_coverage(self.peer_list)
+
+    # Returns the two summary lines printed at the end of the run: bandwidth used for blocks and fork rate,
+    # and number of events processed and how far transactions have spread
+    def summary(self):
+        transactions,coverage=self.transaction_coverage()
+        return [self.relay_stats.summary(self.fork_rate()),
+                f"Events: {self.events}, Transactions: {transactions}, Received by a peer on average: {100*coverage:.1f}%"]
+
+    # Returns the blocks received by every Peer as the columns of the results file (results.py)
+    def columns(self):
+        return result_columns(self.peer_list)
+
+# Runs a simulation with the given Config and returns its Result
+# All the state of the run (including the allocators of block and transaction IDs) is created for it, so that
+# simulations can be run one after the other, or at the same time, in one process
+
+def run_simulation(config):
+
+    peers=config.peers #Number of peers
+    slow=config.slow # Percentage of slow peers
+    lowcpu=config.lowcpu # Percentage of lowcpu peers
+    meantransactiontime=config.meantransactiontime # Mean transaction time in ms
+    meanblocktime=config.meanblocktime # Mean block arrival time in ms
+    seed=config.seed # Seed of the random generator
+    scheduler=config.scheduler # Type of event queue
+    maxevents=config.maxevents # Number of events to be processed
+    maxtime=config.maxtime # Time till which to run the simulation
+    log=EventLog(LEVELS[config.loglevel],config.logfile) # Event log of the simulation
+    trace=TraceWriter(config.trace) if config.trace else None # Binary trace of the simulation
+    topology=config.topology # Generator of the network
+    relay_stats=RelayStats(config.relay) # Way blocks are relayed, and counts of the block messages sent
+    txwindow=config.txwindow # Time in ms transactions are batched over before being relayed
+    block_ids=IdAllocator(1) # IDs of new blocks (0 is reserved for the genesis block)
+    transaction_ids=IdAllocator(0) # IDs of new transactions
+
+    # Single random generator of the simulation, passed to every function that needs random numbers
+    # Variates are drawn from the seeded Generator in batches
     
-    if((args.peers is None) or (args.slow is None) or (args.lowcpu is None) or (args.meanblocktime is None) or (args.meantransactiontime is None)):
-        print("usage: python simulator.py [--peers PEERS] [--slow SLOW] [--lowcpu LOWCPU] [--meantransactiontime MEANTRANSACTIONTIME] [--meanblocktime MEANBLOCKTIME]")
-        exit(0)
+    rng = RandomPool(np.random.default_rng(seed))
         
     # Defined format of tasks below
     
-    #Priority Queue sorts tasks on basis of increasing order of first element, i.e. time
+    #Event Queue (heap or calendar queue) sorts tasks on basis of increasing time, and tasks with the same time in the order they were added
     
-    task_list = PriorityQueue() # [time , peer_ID , type_of_action          , ... ]
-                                # [                 'received_block'        , received_from, Block ]
-                                # [                 'received_transaction'  , received_from , Transaction ]
-                                # [                 'generate_block'        , Block ]
-                                # [                 'generate_transaction'  , Transaction ]
+    task_list = SCHEDULERS[scheduler]()
+                                # Event(time , peer_ID , kind                              , sender        , obj )
+                                # Event(                 EventKind.RECEIVED_BLOCK          , received_from , Block )
+                                # Event(                 EventKind.RECEIVED_TRANSACTION    , received_from , Transaction )
+                                # Event(                 EventKind.GEN_BLOCK               , peer_ID       , Block )
+                                # Event(                 EventKind.GEN_TRANSACTION         , peer_ID       , Transaction )
+                                # Event(                 EventKind.RELAY_TRANSACTIONS      , peer_ID       , None )
+                                # Event(                 EventKind.RECEIVED_TRANSACTIONS   , received_from , list of Transactions )
     
     
     num_low =(int)(peers*lowcpu/100) #Number of nodes with low cpu capabilities
@@ -58,229 +337,133 @@ if __name__=='__main__':
     #Assigning slow nodes
     
     num =(int)(peers*slow/100)
-    ele = np.random.choice(range(peers),num,replace=False) # Choosing a random subset of elements and assigning them as slow 
+    ele = rng.choice(range(peers),num,replace=False) # Choosing a random subset of elements and assigning them as slow 
     
     for i in ele:
         peer_list[i].speed='slow'
     
     #Assigning lowcpu nodes
     
-    ele = np.random.choice(range(peers),num_low,replace=False) # Choosing a random subset of elements and assigning them as lowcpu
+    ele = rng.choice(range(peers),num_low,replace=False) # Choosing a random subset of elements and assigning them as lowcpu
     
     for i in ele:
         peer_list[i].speed='lowcpu'
         peer_list[i].hashingpower=low_hash
         
+    # All nodes are honest
+    
+    honest=Honest()
+    for i in range(peers):
+        peer_list[i].strategy=honest
+        
     # Generating the original genesis block
     
     # Giving all nodes a balance of MININGFEE coins ( so that transactions can be initiated)
     
     transactions=[]
     for i in range(peers):
-        base=Transaction(-1,i,MININGFEE,8000,uuid.uuid4())
+        base=Transaction(-1,i,MININGFEE,8000,transaction_ids())
         transactions.append(base)
         
     balances = [MININGFEE for i in range(peers)]
-    genesis_block = Block(-1,0,-1,-1,transactions,0,0,balances)
+    genesis_block = Block(BlockBody(-1,0,-1,transactions,balances),-1,0,0)
     
     for i in range(peers):
-        peer_list[i].received_blocks.append(genesis_block)
+        add_block(peer_list[i],genesis_block)
             
-    # Graph Creation
+    # Network Creation, neighbors are stored as flat arrays in the topology and as a list in every Peer
 
-    edges=graph_creation(peers)
-    while(not graph_connected(edges,peers)):
-        edges=graph_creation(peers)
-        
+    network=TOPOLOGIES[topology](peers,rng)
         
     for i in range(peers):
-        peer_list[i].neighbors=edges[i]
+        peer_list[i].neighbors=network.neighbors(i).tolist()
+    
+    # Sanity check that the graph is connected, which it is by construction
+    assert(graph_connected([peer.neighbors for peer in peer_list],peers))
         
-    # Setting speed of light propagation delay
+    # Setting the propagation delay, speed and queuing delay of every link
     
-    rho = np.random.uniform(10,500)  
+    links = LinkTable(network,peer_list,rng)
+    
+    # Creating the simulation, which handles the events processed by the engine
+    
+    engine=Engine(task_list)
+    simulation=Simulation(peer_list,engine,links,rng,meanblocktime,meantransactiontime,log,trace,relay_stats,txwindow,block_ids,transaction_ids)
+    
+    # Every Peer starts with the genesis block
+    for i in range(peers):
+        simulation.accepted(peer_list[i],genesis_block,0)
     
     # Initializing the task list with transactions and blocks for each node
     
     for i in range(peers):
         # Need a gen_transation for each node to kickstart the transaction_generation process
-        newtask=transaction_generation(peer_list[i],find_mining_block(peer_list[i]),meantransactiontime,0)
-        task_list.put(newtask)
-        print(newtask)
+        simulation.schedule(transaction_generation(peer_list[i],meantransactiontime,0,rng,transaction_ids))
         
         # Need a gen_block for each node to kickstart the block_generation process
-        newtask = block_generation(peer_list[i],meanblocktime,0)
-        task_list.put(newtask)
-        dump(newtask[3])
-        print(newtask)
+        simulation.schedule(block_generation(peer_list[i],meanblocktime,0,rng,block_ids,transaction_ids))
         
-    count=0 # Determining point till which to run simulation
-    
-    print("--------START------------")
+    # Running the simulation till the given number of events or the given time
     
-    while((not task_list.empty()) and (count<=50000) ):
-        
-        # Get earliest scheduled task in task list
-        
-        task=task_list.get()
-        print(task)
-        
-        if(task[2] == 'received_block'):
-            print("Block ID:", task[4].blk_id)
-        elif(task[2] == 'received_transaction'):
-            print("Transaction ID:",task[4].transaction_id)
-        elif(task[2] == 'gen_block'):
-            print("Block ID:",task[3].blk_id)
-        else:
-            print("Transaction ID:",task[3].transaction_id)
-        
-        count+=1 # Incrementing count
-        
-        if task[2] == 'received_block':
-            
-            #If block already reached, skip
-            if find_block_depth(task[4].blk_id,peer_list[task[1]]) != -1:
-                continue
-            
-            # Creating copy of block which will be updated
-            block = Block(task[4].prev_blk_id,task[4].blk_id,task[4].miner_id,task[1],task[4].transactions,task[4].depth,task[0],task[4].balances)
-            
-            # Finding the depth of the parent block
-            parent_depth = find_block_depth(block.prev_blk_id,peer_list[task[1]])
-            
-            #If no longer longest chain, drop own block
-            if(block.miner_id==peer_list[task[1]].id):
-                if(parent_depth!=peer_list[task[1]].max_depth):
-                    continue
-            
-            # If parent does not exist, cache block
-            
-            if parent_depth == -1:
-                
-                # Making a copy since we should not modify the original block and then appending to cache
-                taskcopy = task.copy()
-                taskcopy[4]=block
-                
-                # Adding a received block in cache only once
-                if not exists_in_cache(block.blk_id,peer_list[task[1]]):
-                    peer_list[task[1]].cacheBlock.append(taskcopy)
-
-                continue
-            
-            # Updating depth of block
-            block.depth=parent_depth+1
-            
-            # Validate transactions of block and update left_transactions of Peer
-            if(validate(block,peer_list[task[1]])):
-                
-                # Updating max depth, list of received blocks, along with a sanity check that owner is correct
-                peer_list[task[1]].max_depth=max(peer_list[task[1]].max_depth,block.depth)
-                peer_list[task[1]].received_blocks.append(block)
-                assert(block.owner==task[1])
-            else:
-                dump(block)
-                print("Validation failed")
-                break
-            
-            # Broadcast to neighbors, except where it is received from
-                
-            for adjacent in peer_list[task[1]].neighbors:
-                if adjacent == task[3]:
-                    continue
-                ntask = broadcast(task,peer_list[task[1]],peer_list[adjacent],rho)
-                task_list.put(ntask)
-                print("Added only:- ",ntask)
-
-            #Cached blocks can be added back now
-            add_cache(task_list,peer_list,peer_list[task[1]],block,rho)
-
-            #Schedule next block generation
-            newtask = block_generation(peer_list[task[1]],meanblocktime,task[0])
-            print("Added only:- ",newtask)
-
-            task_list.put(newtask)
-            
-            pass
-        elif task[2] == 'received_transaction':
-            
-            #If already received, skip rest
-            if exists_transaction(task[4].transaction_id,peer_list[task[1]]) != -1:
-                continue
-            
-            # Create new transaction object for adding into list
-            
-            transaction = Transaction(task[4].start,task[4].destination,task[4].coins,task[4].size,task[4].transaction_id)
-            
-            # Append to received and left transactions
-            peer_list[task[1]].received_transactions.append(transaction)
-            
-            if(not (exists_transaction_in_blocks(transaction,peer_list[task[1]]))):
-                peer_list[task[1]].left_transactions.append(transaction)
-            
-            # Broadcast to neighbors except where it is received from
-            for adjacent in peer_list[task[1]].neighbors:
-                if adjacent == task[3]:
-                    continue
-                ntask = broadcast(task,peer_list[task[1]],peer_list[adjacent],rho)
-                task_list.put(ntask)
-                print("Added only:- ",ntask)
-                
-            pass
-        elif task[2] == 'gen_block':
-            
-            #If not longest chain, stop mining
-            if(task[3].depth!=peer_list[task[1]].max_depth+1):
-                continue
-            
-            #Validate transaction before receiving, but not update, since updation is done in received_block
-            if(validate_not_update(task[3],peer_list[task[1]])):
-                pass
-            else:
-                
-                print("Block should be dropped here! Happens in rare cases!")
-                dump(task[3])
-                continue
-            
-            #Add received_block task to use the received_block code
-            block=deepcopy(task[3])
-            newtask=([task[0],task[1],'received_block',task[1],block])
-            print("Added only:- ",newtask)
-            
-            task_list.put(newtask)
-                        
-            pass
-        elif task[2] == 'gen_transaction':
-            
-            # Add received_transaction task to use the received_transaction code
-            
-            newtask=[task[0],task[1],'received_transaction',task[1],task[3]]
-            print("Added only:- ",newtask)
-            
-            task_list.put(newtask)
-            
-            # Add a new transaction generation task to keep the cycle going
-            
-            newtask=transaction_generation(peer_list[task[1]],find_mining_block(peer_list[task[1]]),meantransactiontime,task[0])
-            print("Added only:- ",newtask)
-            
-            task_list.put(newtask)
-            
-        else:
-            print("ERROR : INVALID TASK TYPE")
-            break
-        pass
+    engine.run(maxevents,maxtime)
+
+    log.close()
+    if trace is not None:
+        trace.close()
+
+    return Result(config,peer_list,relay_stats,engine.count,engine.time)
+
+# Writes the blocks received by every peer to one results file (results.py)
+# The block trees of the given peers are also drawn with Graphviz, and the memory used by the transaction structures
+# of every peer is printed if memory is set
+
+def write_output(result,output,draw,memory):
 
+    columns=result.columns()
+    write_results(output,columns)
 
-# Finally printing out the received blocks of each of the peers in a separate file
+    draw_peers(columns,draw)
 
-for i in range(peers):
+    if memory:
+        for peer in result.peer_list:
+            dump_memory(peer)
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peers", help='number of peers',type=int)
+    parser.add_argument("--slow", help='percentage of slow nodes',type=float)
+    parser.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float)
+    parser.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float)
+    parser.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float)
+    parser.add_argument("--seed", help='seed of the random generator, runs with the same seed and parameters are identical (random if not given)',type=int)
+    parser.add_argument("--scheduler", help='event queue of the simulation, a binary heap or a calendar queue (for very large numbers of pending events)',choices=list(SCHEDULERS),default='heap')
+    parser.add_argument("--maxevents", help='number of events after which the simulation stops',type=int,default=50000)
+    parser.add_argument("--maxtime", help='time in ms after which the simulation stops (no limit if not given)',type=float)
+    parser.add_argument("--loglevel", help='level of the event log, nothing is logged by default',choices=list(LEVELS),default='off')
+    parser.add_argument("--logfile", help='file the event log is written to (JSON lines)',default='Events.jsonl')
+    parser.add_argument("--topology", help='shape of the network: uniform random, small world, scale free or geographic clusters',choices=list(TOPOLOGIES),default='random')
+    parser.add_argument("--trace", help='file a binary trace of the simulation is written to, which can be inspected with replay.py (not traced if not given)')
+    parser.add_argument("--txwindow", help='time in ms new transactions are queued for before being relayed to neighbors in one message (default 0, each is relayed at once)',type=float,default=0)
+    parser.add_argument("--output", help='file the blocks received by every peer are written to, as columns of a NumPy .npz file',default='Results.npz')
+    parser.add_argument("--draw", help='IDs of the peers whose block tree is drawn with Graphviz (none by default)',type=int,nargs='+',default=[])
+    parser.add_argument("--memory", help='print the memory used by the transaction structures of every peer at the end',action='store_true')
+    parser.add_argument("--relay", help='how blocks are relayed to neighbors, as full blocks or as compact blocks (header and short transaction IDs)',choices=RELAY_MODES,default='full')
     
-    s = f"Peer{i}_Block_Details.out"
-    f= open(s,'w')
     
-    for block in peer_list[i].received_blocks:
-        f.write(str(block.blk_id)+" "+str(block.prev_blk_id)+" "+str(block.time_of_arrival)+"\n")
-        dump(block)
-    f.close()
-    show(s)
-    
\ No newline at end of file
+    args=parser.parse_args()
+
+    if((args.peers is None) or (args.slow is None) or (args.lowcpu is None) or (args.meanblocktime is None) or (args.meantransactiontime is None)):
+        print("usage: python simulator.py [--peers PEERS] [--slow SLOW] [--lowcpu LOWCPU] [--meantransactiontime MEANTRANSACTIONTIME] [--meanblocktime MEANBLOCKTIME] [--seed SEED] [--scheduler {heap,calendar}] [--maxevents MAXEVENTS] [--maxtime MAXTIME] [--loglevel {off,block,event,debug}] [--logfile LOGFILE] [--topology {random,smallworld,scalefree,geographic}] [--trace TRACE] [--relay {full,compact}] [--txwindow TXWINDOW] [--output OUTPUT] [--draw DRAW [DRAW ...]] [--memory]")
+        exit(0)
+
+    config=Config(args.peers,args.slow,args.lowcpu,args.meantransactiontime,args.meanblocktime,seed=args.seed,scheduler=args.scheduler,maxevents=args.maxevents,maxtime=args.maxtime,loglevel=args.loglevel,logfile=args.logfile,topology=args.topology,trace=args.trace,relay=args.relay,txwindow=args.txwindow)
+    result=run_simulation(config)
+
+    # Bandwidth used for blocks, the fraction of blocks that ended up off the longest chain,
+    # the number of events processed and how far transactions have spread
+
+    for line in result.summary():
+        print(line)
+
+    write_output(result,args.output,args.draw,args.memory)
@@ -0,0 +1,37 @@
+from utility import *
+
+
+# Behaviour of a Peer, i.e. which block it mines upon and what it does with the blocks it receives
+# The event handlers of the simulation are the same for every Peer, and call the strategy of the Peer for these decisions
+
+# Honest node, following the protocol
+
+class Honest:
+    __slots__=()
+
+    # Returns the block to be mined upon
+    def mining_block(self,peer):
+        return find_mining_block(peer)
+
+    # Whether a block mined by the Peer itself is still to be received, i.e. it extends the longest chain
+    def keep_mined_block(self,peer,block):
+        return block.depth==peer.max_depth+1
+
+    # Whether a received block is to be dropped before it is looked at
+    def ignore_block(self,peer,block):
+        return False
+
+    # Whether a block mined by the Peer itself, whose parent is no longer the end of the longest chain, is to be dropped
+    def drop_stale_block(self,peer):
+        return True
+
+    # Adds a validated block (whose Block object is block, received in task) to the blockchain of the Peer
+    # and broadcasts it to neighbors, except where it is received from
+    def accept_block(self,simulation,peer,task,block,current_time):
+        peer.max_depth=max(peer.max_depth,block.depth)
+        add_block(peer,block)
+        simulation.relay(peer,(task,),task.sender)
+
+    # Called when the simulation ends
+    def release(self,simulation,peer,current_time):
+        pass
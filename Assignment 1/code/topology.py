@@ -0,0 +1,236 @@
+import itertools
+import numpy as np
+from graph import edge_lists , graph_creation
+
+
+# Network topologies of the simulator, each generator takes the number of peers and the random generator and returns a Topology
+# All of them are connected by construction. Networks too small for a generator are created by graph_creation instead
+
+# Neighbors on each side of a node in the ring lattice of the small world network, and probability of rewiring one of its edges
+SMALL_WORLD_NEIGHBORS = 3
+SMALL_WORLD_REWIRING = 0.1
+
+# Number of edges of every node joining the scale free network
+SCALE_FREE_EDGES = 3
+
+# Number of clusters of the geographic network (which spans the unit square), half width of a cluster,
+# neighbors on each side of a node in the ring of its cluster and edges between the clusters next to each other
+GEOGRAPHIC_CLUSTERS = 8
+GEOGRAPHIC_SPREAD = 0.05
+GEOGRAPHIC_NEIGHBORS = 2
+GEOGRAPHIC_GATEWAYS = 2
+
+# Adjacency of the network stored as flat arrays (compressed sparse rows), one entry per directed edge
+# The neighbors of node i are indices[indptr[i]:indptr[i+1]], and an entry of indices identifies the edge in per edge arrays
+
+class Topology:
+    __slots__=('indptr','indices','positions')
+
+    def __init__(self,edges,positions=None):
+        self.indptr=np.zeros(len(edges)+1,dtype=np.int64) # Offset in indices of the neighbors of every node
+        self.indptr[1:]=np.cumsum([len(neighbors) for neighbors in edges])
+        self.indices=np.fromiter(itertools.chain.from_iterable(edges),dtype=np.int64,count=self.indptr[-1]) # Neighbors of all nodes
+        self.positions=positions                    # Position of every node in the unit square (array of shape (peers,2)), None if not geographic
+
+    def __len__(self):
+        return len(self.indptr)-1
+
+    # Returns the array of neighbors of a node
+    def neighbors(self,node):
+        return self.indices[self.indptr[node]:self.indptr[node+1]]
+
+    # Returns the list of neighbors of every node
+    def edge_lists(self):
+        return [self.neighbors(i).tolist() for i in range(len(self))]
+
+    # Returns the topology with a node also connected to the given other nodes
+    def connect(self,node,others):
+        edges=self.edge_lists()
+        existing=set(edges[node])
+        for ele in others:
+            ele=int(ele)
+            if ele==node or ele in existing:
+                continue
+            existing.add(ele)
+            edges[node].append(ele)
+            edges[ele].append(node)
+        return Topology(edges,self.positions)
+
+# Returns the edges of a ring lattice on the given nodes (in order), every node connected to the given number of nodes on each side
+# The edges to the next node (which connect the lattice) are the first ones
+
+def ring_lattice(nodes,neighbors):
+    neighbors=min(neighbors,(len(nodes)-1)//2) if len(nodes)>2 else len(nodes)-1
+    lattice=[np.stack([nodes,np.roll(nodes,-j)],axis=1) for j in range(1,neighbors+1)]
+    if len(nodes)==2:
+        lattice=[nodes[None,:]]
+    return np.concatenate(lattice) if lattice else np.empty((0,2),dtype=np.int64)
+
+# Uniform random graph with degrees between 4 and 8 (graph.py)
+
+def random_topology(peers,rng):
+    return Topology(graph_creation(peers,rng))
+
+# Watts-Strogatz small world network: a ring lattice in which every edge, except the ones to the next node on the ring
+# (which keep the network connected), is rewired to a random node with probability SMALL_WORLD_REWIRING
+
+def small_world(peers,rng):
+
+    if peers<4:
+        return random_topology(peers,rng)
+
+    # Nodes are placed on the ring in a random order
+    lattice=ring_lattice(rng.permutation(peers),SMALL_WORLD_NEIGHBORS)
+    ring=lattice[:peers]
+    others=lattice[peers:].copy()
+
+    rewired=rng.choice([False,True],size=len(others),p=[1-SMALL_WORLD_REWIRING,SMALL_WORLD_REWIRING])
+    others[rewired,1]=rng.choice(peers,size=int(rewired.sum()))
+
+    return Topology(edge_lists(peers,np.concatenate([ring,others])))
+
+# Barabasi-Albert scale free network: starting from a complete graph on SCALE_FREE_EDGES+1 nodes, every other node joins
+# with edges to SCALE_FREE_EDGES distinct nodes, each chosen with probability proportional to its degree
+
+def scale_free(peers,rng):
+
+    m=SCALE_FREE_EDGES
+    if peers<=m+1:
+        return random_topology(peers,rng)
+
+    candidates=[(u,v) for u in range(m+1) for v in range(u+1,m+1)]
+
+    # Every node appears once for every edge it has, so that a uniform choice from it is proportional to degree
+    ends=[u for edge in candidates for u in edge]
+
+    for node in range(m+1,peers):
+        chosen=[]
+        while len(chosen)<m:
+            ele=ends[rng.integers(len(ends))]
+            if ele not in chosen:
+                chosen.append(ele)
+        for ele in chosen:
+            candidates.append((node,ele))
+            ends.append(node)
+            ends.append(ele)
+
+    # Node IDs are assigned in a random order, so that the earliest (best connected) nodes are not the lowest IDs
+    order=rng.permutation(peers)
+    return Topology(edge_lists(peers,order[np.array(candidates)]))
+
+# Returns the position of every node along a Z-order curve over the unit square, so that nodes next to each other
+# in that order are mostly close to each other
+
+def z_order(positions):
+    cells=np.clip((positions*1024).astype(np.int64),0,1023)
+    code=np.zeros(len(positions),dtype=np.int64)
+    for bit in range(10):
+        code|=((cells[:,0]>>bit)&1)<<(2*bit)
+        code|=((cells[:,1]>>bit)&1)<<(2*bit+1)
+    return code
+
+# Geographic network: nodes are placed in GEOGRAPHIC_CLUSTERS clusters around random centers, and linked to nodes close to them
+# in their own cluster (a ring lattice along the Z-order curve). Each cluster is linked to the next one (in a ring of clusters)
+# through the GEOGRAPHIC_GATEWAYS pairs of their nodes closest to the other cluster. The positions are kept, for per link latency
+
+def geographic(peers,rng):
+
+    clusters=min(GEOGRAPHIC_CLUSTERS,peers)
+    if peers<4:
+        return random_topology(peers,rng)
+
+    spread=GEOGRAPHIC_SPREAD
+    centers=np.array([[rng.uniform(spread,1-spread),rng.uniform(spread,1-spread)] for c in range(clusters)])
+
+    # Nodes are assigned to clusters in a random order, as evenly as possible
+    cluster=rng.permutation(np.arange(peers)%clusters)
+    positions=centers[cluster]+np.array([[rng.uniform(-spread,spread),rng.uniform(-spread,spread)] for i in range(peers)])
+
+    members=[np.flatnonzero(cluster==c) for c in range(clusters)]
+    code=z_order(positions)
+    candidates=[ring_lattice(nodes[np.argsort(code[nodes],kind='stable')],GEOGRAPHIC_NEIGHBORS) for nodes in members]
+
+    for c in range(clusters if clusters>2 else clusters-1):
+        nxt=(c+1)%clusters
+        gateways=min(GEOGRAPHIC_GATEWAYS,len(members[c]),len(members[nxt]))
+        here=members[c][np.argsort(np.linalg.norm(positions[members[c]]-centers[nxt],axis=1),kind='stable')[:gateways]]
+        there=members[nxt][np.argsort(np.linalg.norm(positions[members[nxt]]-centers[c],axis=1),kind='stable')[:gateways]]
+        candidates.append(np.stack([here,there],axis=1))
+
+    return Topology(edge_lists(peers,np.concatenate(candidates)),positions)
+
+# Range of the propagation delay of a link in ms, drawn uniformly for every pair of connected peers when the network
+# has no positions, and otherwise growing with the distance between the peers from the minimum to the maximum (across the unit square)
+MIN_PROPAGATION = 10
+MAX_PROPAGATION = 500
+
+# Link speeds in kilobits per second, when both peers are fast and otherwise
+FAST_LINK = 100000
+SLOW_LINK = 5000
+
+# Size in kilobits whose transmission time over the link is the mean of the queuing delay
+QUEUING_SIZE = 96
+
+# Degree from which the delays of a peer are computed on slices of the arrays, below it a single call to numpy costs more
+# than computing the few delays one at a time from rows of the link parameters taken out of the arrays beforehand
+VECTOR_DEGREE = 32
+
+# Parameters of every link of the network, built once with the network and stored in arrays indexed by directed edge
+# (the same positions as the neighbors in Topology.indices), so that the links of a peer are one slice
+
+class LinkTable:
+    __slots__=('indptr','propagation','bandwidth','queuing','rows')
+
+    def __init__(self,topology,peer_list,rng):
+        peers=len(topology)
+        source=np.repeat(np.arange(peers),np.diff(topology.indptr))
+        dest=topology.indices
+
+        # Both directions of a link have the same propagation delay
+        pairs,link=np.unique(np.minimum(source,dest)*peers+np.maximum(source,dest),return_inverse=True)
+        if topology.positions is None:
+            rho=np.array([rng.uniform(MIN_PROPAGATION,MAX_PROPAGATION) for pair in pairs])
+        else:
+            distance=np.linalg.norm(topology.positions[pairs//peers]-topology.positions[pairs%peers],axis=1)
+            rho=MIN_PROPAGATION+(MAX_PROPAGATION-MIN_PROPAGATION)*np.minimum(distance/np.sqrt(2),1)
+
+        fast=np.array([peer.speed=='fast' for peer in peer_list])
+
+        self.indptr=topology.indptr.tolist()        # Offset of the links of every peer (Topology.indptr)
+        self.propagation=rho[link]                  # Speed of light propagation delay of every link in ms
+        self.bandwidth=np.where(fast[source]&fast[dest],FAST_LINK,SLOW_LINK).astype(np.float64) # Link speed in kilobits per second
+        self.queuing=QUEUING_SIZE/self.bandwidth    # Mean queuing delay of every link
+
+        # (propagation delay, ms per kilobit, mean queuing delay) of every link of the peers below VECTOR_DEGREE, None for the others
+        links=list(zip(self.propagation.tolist(),(1000/self.bandwidth).tolist(),self.queuing.tolist()))
+        self.rows=[links[start:end] if end-start<VECTOR_DEGREE else None for start,end in zip(self.indptr,self.indptr[1:])]
+
+    # Returns the delays in ms of a message of given size in kilobits from a peer to each of its neighbors (in the order of Peer.neighbors)
+    def delays(self,peer_id,size,rng):
+        row=self.rows[peer_id]
+        if row is not None:
+            return [rho+size*per_kilobit+noise*queuing for (rho,per_kilobit,queuing),noise in zip(row,rng.standard_exponentials(len(row)))]
+        start=self.indptr[peer_id]
+        end=self.indptr[peer_id+1]
+        return (self.propagation[start:end]+(size*1000)/self.bandwidth[start:end]+rng.exponential_array(self.queuing[start:end])).tolist()
+
+    # Returns the delays in ms of messages of given sizes (one for each neighbor, in the order of Peer.neighbors) from a peer to its neighbors
+    def batch_delays(self,peer_id,sizes,rng):
+        start=self.indptr[peer_id]
+        end=self.indptr[peer_id+1]
+        return (self.propagation[start:end]+(np.array(sizes,dtype=np.float64)*1000)/self.bandwidth[start:end]+rng.exponential_array(self.queuing[start:end])).tolist()
+
+    # Returns the delays in ms of a compact block message of given size from a peer to each of its neighbors, where a neighbor
+    # missing transactions also sends a request (of size request, an array over the neighbors) back over the link and receives
+    # the missing transactions (of total size missing, an array over the neighbors), neighbors missing nothing have zero in both
+    def compact_delays(self,peer_id,size,request,missing,rng):
+        start=self.indptr[peer_id]
+        end=self.indptr[peer_id+1]
+        propagation=self.propagation[start:end]
+        bandwidth=self.bandwidth[start:end]
+        queuing=self.queuing[start:end]
+        delays=propagation+(size*1000)/bandwidth+rng.exponential_array(queuing)
+        round_trip=2*propagation+((request+missing)*1000)/bandwidth+rng.exponential_array(queuing)+rng.exponential_array(queuing)
+        return np.where(request>0,delays+round_trip,delays).tolist()
+
+TOPOLOGIES = {'random':random_topology,'smallworld':small_world,'scalefree':scale_free,'geographic':geographic}
@@ -0,0 +1,67 @@
+import struct
+import numpy as np
+from scheduler import EventKind
+
+
+# Binary trace of the simulation, a sequence of fixed size records (33 bytes, little endian):
+#   time (double), kind (unsigned byte), peer (int), sender (int), obj (long long), parent (long long)
+# Records of kind 0-5 are processed events (EventKind), obj being the ID of the transaction/block (the number of transactions
+# for a batch, -1 for relay_transactions) and parent -1
+# Records of kind ACCEPTED are blocks accepted into the block tree of peer, sender being the miner and parent the previous block
+
+ACCEPTED = len(EventKind)
+
+RECORD = struct.Struct('<dBiiqq')
+
+# Same layout as RECORD, for reading a trace with numpy
+RECORD_DTYPE = np.dtype([('time','<f8'),('kind','u1'),('peer','<i4'),('sender','<i4'),('obj','<i8'),('parent','<i8')])
+
+# Kinds of events whose object is a block, and whose object is a single transaction
+BLOCK_KINDS = (EventKind.GEN_BLOCK,EventKind.RECEIVED_BLOCK)
+TRANSACTION_KINDS = (EventKind.GEN_TRANSACTION,EventKind.RECEIVED_TRANSACTION)
+
+# Packs the records of the trace into a preallocated buffer, which is written to the file when full
+
+class TraceWriter:
+    __slots__=('file','buffer','offset','end')
+
+    def __init__(self,path,buffer_records=1<<15):
+        self.file=open(path,'wb')                   # File of the trace
+        self.buffer=bytearray(RECORD.size*buffer_records) # Records not yet written to the file
+        self.offset=0                               # Size in bytes of the records in the buffer
+        self.end=len(self.buffer)                   # Size in bytes of the buffer
+
+    # Records a processed event
+    def event(self,task):
+        obj=task.obj
+        kind=task.kind
+        if kind in TRANSACTION_KINDS:
+            obj_id=obj.transaction_id
+        elif kind in BLOCK_KINDS:
+            obj_id=obj.blk_id
+        else:
+            obj_id=-1 if obj is None else len(obj)
+        RECORD.pack_into(self.buffer,self.offset,task.time,task.kind,task.peer,task.sender,obj_id,-1)
+        self.offset+=RECORD.size
+        if self.offset==self.end:
+            self.flush()
+
+    # Records a block accepted into the block tree of a Peer
+    def accepted(self,current_time,peer_id,block):
+        RECORD.pack_into(self.buffer,self.offset,current_time,ACCEPTED,peer_id,block.miner_id,block.blk_id,block.prev_blk_id)
+        self.offset+=RECORD.size
+        if self.offset==self.end:
+            self.flush()
+
+    def flush(self):
+        self.file.write(memoryview(self.buffer)[:self.offset])
+        self.offset=0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+# Reads a whole trace into a numpy structured array of records
+
+def read_trace(path):
+    return np.fromfile(path,dtype=RECORD_DTYPE)
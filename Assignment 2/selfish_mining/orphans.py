@@ -0,0 +1,102 @@
+import argparse
+import sys
+from scheduler import Event , EventKind
+from strategy import Honest
+from structures import Block , BlockBody , IdAllocator , Peer , Transaction
+from utility import *
+
+# Check of out of order blocks: chains of the given depth are built on the genesis block, and a single Peer receives every
+# block except the first of each chain before its parent, i.e. in reverse order. Once the first blocks arrive, every chain
+# has to be added back from the cache, without raising the recursion limit (chains deeper than it used to crash the simulator)
+
+# Stands in for the Simulation of simulator.py, where the Peer has no neighbors, so that nothing is broadcast or logged
+
+class OrphanSimulation:
+    __slots__=()
+
+    def relay(self,peer,tasks,sender):
+        pass
+
+    def accepted(self,peer,block,current_time):
+        pass
+
+# Returns a Peer holding only the genesis block (with the given number of peers), and the given number of chains of
+# received_block tasks of the given depth built on the genesis block, the chains in order from the genesis block
+
+def orphan_chains(peers,chains,depth):
+
+    block_ids=IdAllocator(1)
+    transaction_ids=IdAllocator(0)
+
+    peer=Peer(0,'fast','highcpu',1.0)
+    peer.strategy=Honest()
+
+    transactions=[Transaction(-1,i,MININGFEE,8000,transaction_ids()) for i in range(peers)]
+    genesis_block=Block(BlockBody(-1,0,-1,transactions,[MININGFEE for i in range(peers)]),-1,0,0)
+    add_block(peer,genesis_block)
+
+    tasks=[]
+    for i in range(chains):
+        prev_blk_id=genesis_block.blk_id
+        chain=[]
+        for j in range(depth):
+            block=Block(BlockBody(prev_blk_id,block_ids(),1,[Transaction(-1,1,MININGFEE,8000,transaction_ids())]),0,0,j)
+            chain.append(Event(j,0,EventKind.RECEIVED_BLOCK,1,block))
+            prev_blk_id=block.blk_id
+        tasks.append(chain)
+
+    return peer,tasks
+
+# Caches every block of the chains except the first ones, deepest first and the chains interleaved
+
+def cache_orphans(peer,chains):
+    for j in reversed(range(1,len(chains[0]))):
+        for chain in chains:
+            task=chain[j]
+            if not exists_in_cache(task.obj.blk_id,peer):
+                cache_block(task,peer)
+
+# Delivers the first block of every chain, followed by the same steps as a received_block task, which adds the cached chain on it
+
+def add_back(peer,chains):
+    simulation=OrphanSimulation()
+    for chain in chains:
+        task=chain[0]
+        block=task.obj
+        block.depth=find_block_depth(block.prev_blk_id,peer)+1
+        validate(block,peer)
+        peer.strategy.accept_block(simulation,peer,task,block,task.time)
+        add_cache(simulation,peer,block,task.time)
+
+# Checks that every block of the chains is in the blockchain of the Peer at its depth, that the block to be mined upon is
+# the tip of the first chain (all tips having the same depth and time, the first one added is kept) and that no orphan is left
+
+def check_orphans(peer,chains):
+
+    depth=len(chains[0])
+    assert len(peer.received_blocks)==1+len(chains)*depth, len(peer.received_blocks)
+    for chain in chains:
+        for j,task in enumerate(chain):
+            block=get_block(task.obj.blk_id,peer)
+            assert block is task.obj, task.obj.blk_id
+            assert block.depth==j+1, (block.blk_id,block.depth,j+1)
+    assert peer.max_depth==depth, peer.max_depth
+    assert find_mining_block(peer) is chains[0][-1].obj, find_mining_block(peer).blk_id
+    assert not peer.cacheBlock and not peer.cached_blocks, len(peer.cached_blocks)
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", help='depth of every chain, deeper than the recursion limit by default',type=int,default=3000)
+    parser.add_argument("--chains", help='number of chains built on the genesis block',type=int,default=2)
+    parser.add_argument("--peers", help='number of peers (length of the balances list)',type=int,default=10)
+
+    args=parser.parse_args()
+
+    peer,chains=orphan_chains(args.peers,args.chains,args.depth)
+    cache_orphans(peer,chains)
+    add_back(peer,chains)
+    check_orphans(peer,chains)
+
+    print(f"Chains: {args.chains}, Depth: {args.depth}, Recursion limit: {sys.getrecursionlimit()}")
+    print(f"Blocks: {len(peer.received_blocks)}, Max depth: {peer.max_depth}, Tip: {find_mining_block(peer).blk_id}, Left in cache: {len(peer.cached_blocks)}")
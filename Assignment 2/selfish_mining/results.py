@@ -0,0 +1,38 @@
+import numpy as np
+
+
+# Results of a simulation, the blocks received by every Peer as columns of one NumPy .npz file, with one row for every
+# block received by a Peer, the rows of each Peer in order of peer and, within a Peer, in the order the blocks were received:
+#   peer (ID of the Peer), block (ID of the block), parent (ID of the previous block, -1 for the genesis block),
+#   arrival (time in ms at which the Peer received the block) and miner (ID of the Peer which mined the block, -1 for the genesis block)
+
+COLUMNS = ['peer','block','parent','arrival','miner']
+
+# Returns the columns of the results of a list of Peers, as a dict of arrays
+
+def result_columns(peer_list):
+    counts=[len(peer.received_blocks) for peer in peer_list]
+    total=sum(counts)
+    blocks=[block for peer in peer_list for block in peer.received_blocks]
+    return {'peer':np.repeat(np.arange(len(peer_list),dtype=np.int32),counts),
+            'block':np.fromiter((block.blk_id for block in blocks),dtype=np.int64,count=total),
+            'parent':np.fromiter((block.prev_blk_id for block in blocks),dtype=np.int64,count=total),
+            'arrival':np.fromiter((block.time_of_arrival for block in blocks),dtype=np.float64,count=total),
+            'miner':np.fromiter((block.miner_id for block in blocks),dtype=np.int32,count=total)}
+
+# Writes the columns of the results to a file (.npz is added to the name if missing)
+
+def write_results(file_name,columns):
+    np.savez_compressed(file_name,**columns)
+
+# Returns the columns of the results read from a file, as a dict of arrays
+
+def read_results(file_name):
+    with np.load(file_name) as data:
+        return {name:data[name] for name in COLUMNS}
+
+# Returns the rows of the results of a single Peer, as a dict of arrays
+
+def peer_rows(columns,peer):
+    rows=columns['peer']==peer
+    return {name:columns[name][rows] for name in COLUMNS}
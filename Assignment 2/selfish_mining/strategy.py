@@ -0,0 +1,133 @@
+from utility import *
+
+
+# Behaviour of a Peer, i.e. which block it mines upon and what it does with the blocks it receives
+# The event handlers of the simulation are the same for every Peer, and call the strategy of the Peer for these decisions
+
+# Honest node, following the protocol
+
+class Honest:
+    __slots__=()
+
+    # Returns the block to be mined upon
+    def mining_block(self,peer):
+        return find_mining_block(peer)
+
+    # Whether a block mined by the Peer itself is still to be received, i.e. it extends the longest chain
+    def keep_mined_block(self,peer,block):
+        return block.depth==peer.max_depth+1
+
+    # Whether a received block is to be dropped before it is looked at
+    def ignore_block(self,peer,block):
+        return False
+
+    # Whether a block mined by the Peer itself, whose parent is no longer the end of the longest chain, is to be dropped
+    def drop_stale_block(self,peer):
+        return True
+
+    # Adds a validated block (whose Block object is block, received in task) to the blockchain of the Peer
+    # and broadcasts it to neighbors, except where it is received from
+    def accept_block(self,simulation,peer,task,block,current_time):
+        peer.max_depth=max(peer.max_depth,block.depth)
+        add_block(peer,block)
+        simulation.relay(peer,(task,),task.sender)
+
+    # Called when the simulation ends
+    def release(self,simulation,peer,current_time):
+        pass
+
+# Selfish mining attacker
+# Blocks mined by the attacker are kept in its secret chain, and are broadcast only when the honest chain catches up
+
+class Selfish(Honest):
+    __slots__=()
+
+    # The attacker mines upon its secret chain, if it has a lead
+    def mining_block(self,peer):
+        if(peer.attacker_lead!=0):
+            return peer.secret_chain[-1].obj
+        return find_mining_block(peer)
+
+    # A mined block extends either the longest chain or the secret chain
+    def keep_mined_block(self,peer,block):
+        if(block.depth==peer.max_depth+1):
+            return True
+        return len(peer.secret_chain)!=0 and block.depth==peer.secret_chain[-1].obj.depth+1
+
+    # If the attacker finds a block generated by itself, then it checks if
+    # it is the block with the maximum depth among blocks generated by itself
+    # if not, then the block is dropped. This stops the attacker from branching 
+    # out on from its own chain
+    def ignore_block(self,peer,block):
+        return block.miner_id==peer.id and block.depth<=find_own_max_depth(peer)
+
+    # Own blocks are mined upon the secret chain, which is ahead of the longest chain while there is a lead
+    def drop_stale_block(self,peer):
+        return peer.attacker_lead==0
+
+    # Broadcasts the first num blocks of the secret chain to neighbors (except sender) at current_time, all in one relay,
+    # then adds them to the list of received blocks and removes them from the secret chain
+    def publish(self,simulation,peer,num,sender,current_time):
+        
+        for task in peer.secret_chain[:num]:
+            task.time=current_time
+        simulation.relay(peer,peer.secret_chain[:num],sender)
+        
+        # Added the secret blocks to list of received blocks and updated the max_depth
+        for task in peer.secret_chain[:num]:
+            add_block(peer,task.obj)
+            peer.max_depth=max(peer.max_depth,task.obj.depth)
+        
+        # Removed the blocks from the secret chain
+        remove_secret_blocks(peer,num)
+
+    def accept_block(self,simulation,peer,task,block,current_time):
+        
+        # If the attacker node receives a block mined by itself
+        # Then add this block (actually task) to the secret chain
+        
+        if(block.miner_id==peer.id):
+            
+            # Saving the Block object of the attacker, so that the value of block depth
+            # and other updated parameters are saved in the block
+            secret_task=task.copy()
+            secret_task.obj=block
+            add_secret_block(peer,secret_task)
+            peer.attacker_lead+=1
+            return
+        
+        # If attacker node receives a block not mined by itself
+        # First, it updates its max_depth and list of received blocks
+        # Then, it takes actions based on its lead over the honest chain
+        # Obviously it does not broadcast the honest block received
+        
+        peer.max_depth=max(peer.max_depth,block.depth)
+        add_block(peer,block)
+        
+        if peer.attacker_lead>2:
+            
+            # If attacker lead is greater than 2,
+            # the attacker node, broadcasts exactly one node,
+            # keeping the rest of the chain secret.
+            
+            self.publish(simulation,peer,1,task.sender,current_time)
+            peer.attacker_lead-=1
+            
+        elif peer.attacker_lead==2:
+            
+            # If lead is of only 2 blocks, just broadcast both the secret blocks
+            
+            self.publish(simulation,peer,2,task.sender,current_time)
+            peer.attacker_lead=0
+            
+        elif peer.attacker_lead==1:
+            
+            # If lead is of only one block, just broadcast the secret block
+            
+            self.publish(simulation,peer,1,task.sender,current_time)
+            peer.attacker_lead=0
+
+    # When simulation ends, the attacker node broadcasts its entire secret chain
+    def release(self,simulation,peer,current_time):
+        self.publish(simulation,peer,len(peer.secret_chain),None,current_time)
+        peer.attacker_lead=0
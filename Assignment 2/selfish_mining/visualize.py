@@ -1,29 +1,42 @@
 from treelib import Tree, Node
+import argparse
 import sys
 import subprocess
+from results import peer_rows , read_results
+
+# Draws a block tree with Graphviz, given the IDs, previous block IDs, times and miners of its blocks (in an order where
+# every block comes after its parent), into file_name.dot and file_name.pdf
+
+def show(blocks,parents,times,miners,file_name):
 
-def show(file_name):
-    
-    f = open(file_name,'r')
-    
-    lines = f.readlines()
-    f.close()
     tree=Tree()
-    
-    for line in lines:
-        line=line.strip().split()
-        # print("Hello")
-        if line[1] == '-1':
-            tree.create_node(line[2],line[0])
+
+    for blk_id,prev_blk_id,time,miner_id in zip(blocks,parents,times,miners):
+        if prev_blk_id == -1:
+            tree.create_node(str(time),str(blk_id))
         else:
-            tree.create_node(str(line[2])+"\n"+str(line[0])+"\n"+str(line[3]),line[0],line[1])
-    
-    tree.to_graphviz(file_name[:-3]+"dot")
-    output=subprocess.check_output(['dot','-Tpdf',file_name[:-3]+"dot"])
-    
-    f = open(file_name[:-3]+"pdf",'wb')
+            tree.create_node(str(time)+"\n"+str(blk_id)+"\n"+str(miner_id),str(blk_id),str(prev_blk_id))
+
+    tree.to_graphviz(file_name+".dot")
+    output=subprocess.check_output(['dot','-Tpdf',file_name+".dot"])
+
+    f = open(file_name+".pdf",'wb')
     f.write(output)
     f.close()
-    # subprocess.check_call(['rm','temp.dot'])
-    # subprocess.check_call(['rm',file_name])
-    
\ No newline at end of file
+
+# Draws the block tree of each of the given peers from the columns of the results of a simulation, into Peer<ID>_Block_Tree.pdf
+
+def draw_peers(columns,peers):
+    for i in peers:
+        rows=peer_rows(columns,i)
+        show(rows['block'].tolist(),rows['parent'].tolist(),rows['arrival'].tolist(),rows['miner'].tolist(),f"Peer{i}_Block_Tree")
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results", help='results file written by simulator.py')
+    parser.add_argument("--peers", help='IDs of the peers whose block tree is drawn',type=int,nargs='+',required=True)
+
+    args=parser.parse_args()
+
+    draw_peers(read_results(args.results),args.peers)
@@ -3,51 +3,76 @@ from queue import PriorityQueue
 import numpy as np
 
 
-# Creates a random graph
+# Degrees of the nodes of the random graph
+MIN_DEGREE = 4
+MAX_DEGREE = 8
 
-def graph_creation(peers):
-    
-    degree=[0 for i in range(peers)] # Keeping a count of degree of each vertex
+# Creates a random graph, connected by construction, in which every node has a degree between MIN_DEGREE and MAX_DEGREE
+# Returns the list of neighbors of every node
 
-    edges=[[] for i in range(peers)] # Actual edges in the graph
+def graph_creation(peers,rng):
+    
+    # A ring through all the nodes in a random order, which connects the graph
+    order=rng.permutation(peers)
+    if peers>2:
+        ring=np.stack([order,np.roll(order,-1)],axis=1)
+    else:
+        ring=order[None,:] if peers==2 else np.empty((0,2),dtype=np.int64)
+    
+    # Choose the degree of every node randomly, each node then gets its remaining degree worth of stubs, which are paired up at random
+    target=np.minimum(rng.choice(np.arange(MIN_DEGREE,MAX_DEGREE+1),size=peers),peers-1)
+    stubs=rng.permutation(np.repeat(np.arange(peers),np.maximum(target-2,0)))
+    stubs=stubs[:len(stubs)//2*2].reshape(-1,2)
     
-    saturated=[] # Nodes that have achieved their maximum degree
+    # Dropping self loops and repeated edges (keeping the ring), which can only lower the degree of a node below its choice
+    edges=edge_lists(peers,np.concatenate([ring,stubs])) # Actual edges in the graph
     
+    # The few nodes left below the minimum degree are connected to random nodes which are not saturated
+    # (a saturated node is only taken if none other is found in as many attempts as there are nodes)
+    minimum=min(MIN_DEGREE,peers-1)
     for i in range(peers):
-        num=np.random.choice([4,5,6,7,8]) # Choose the degree of the current node randomly
-        
-        if num<=degree[i]:
-            # If current degree is more than the choice, then skip
-            continue
-        
-        # From all nodes having index greater than i, we remove the saturated nodes to get potential neighbors
-        potential_neighbors=list(set(range(i+1,peers))-set(saturated))
-        
-        # From the potential neighbors choose the required number of neighbors, or all of them if not enough neighbors are available
-        
-        neighbors = np.random.choice(potential_neighbors,min(len(potential_neighbors),num-degree[i]),replace=False)
-        
-        for ele in neighbors:
-            
-            # Add edge and update degree and saturated nodes
+        attempts=0
+        while len(edges[i])<minimum:
+            ele=int(rng.integers(peers))
+            attempts+=1
+            if ele==i or ele in edges[i] or (len(edges[ele])>=MAX_DEGREE and attempts<=peers):
+                continue
             edges[i].append(ele)
             edges[ele].append(i)
-            degree[i]+=1
-            degree[ele]+=1
-            if(degree[ele]==8):
-                saturated.append(ele)
-            
+    
+    return edges
+
+# Returns the list of neighbors of every node for an array of candidate edges (one row per edge), dropping self loops
+# and repeated edges (the first one is kept), and keeping the order of the edges
+
+def edge_lists(peers,candidates):
+    
+    low=candidates.min(axis=1)
+    high=candidates.max(axis=1)
+    keep=low!=high
+    low=low[keep]
+    high=high[keep]
+    first=np.sort(np.unique(low*peers+high,return_index=True)[1])
+    
+    edges=[[] for i in range(peers)]
+    for u,v in zip(low[first].tolist(),high[first].tolist()):
+        edges[u].append(v)
+        edges[v].append(u)
+    
     return edges
 
-# Recursive Depth First Search
+# Iterative Depth First Search, so that the depth of the search is not limited by the recursion limit
 
 def dfs(edges,root,visited):
     visited[root]=True
+    stack=[root]
     
-    for x in edges[root]:
-        if visited[x]:
-            continue
-        dfs(edges,x,visited)
+    while stack:
+        for x in edges[stack.pop()]:
+            if visited[x]:
+                continue
+            visited[x]=True
+            stack.append(x)
 
 # Checks if graph is connected using DFS
 
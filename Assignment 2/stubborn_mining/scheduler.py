@@ -0,0 +1,186 @@
+import heapq
+from enum import IntEnum
+
+
+# Types of events (tasks) in the simulation
+
+class EventKind(IntEnum):
+    GEN_TRANSACTION=0                               # Peer generates a new transaction, obj is the Transaction
+    GEN_BLOCK=1                                     # Peer finishes mining a block, obj is the Block
+    RECEIVED_TRANSACTION=2                          # Peer receives a transaction from sender, obj is the Transaction
+    RECEIVED_BLOCK=3                                # Peer receives a block from sender, obj is the Block
+    RELAY_TRANSACTIONS=4                            # Peer sends the transactions queued for relay to its neighbors, obj is None
+    RECEIVED_TRANSACTIONS=5                         # Peer receives a batch of transactions from sender, obj is the list of Transactions
+
+# Names of the event kinds, as printed in the output of the simulator
+EVENT_NAMES = ['gen_transaction','gen_block','received_transaction','received_block','relay_transactions','received_transactions']
+
+# A task of the simulation, scheduled at a given time for a given Peer
+
+class Event:
+    __slots__=('time','peer','kind','sender','obj')
+
+    def __init__(self,time,peer,kind,sender,obj):
+        self.time=time                              # Time at which the event is to be processed
+        self.peer=peer                              # ID of Peer which processes the event
+        self.kind=kind                              # Type of event (EventKind)
+        self.sender=sender                          # ID of Peer from which a transaction/block is received (the Peer itself for generated ones)
+        self.obj=obj                                # Transaction/Block of the event
+
+    # Returns a new event with the same fields
+    def copy(self):
+        return Event(self.time,self.peer,self.kind,self.sender,self.obj)
+
+    def __repr__(self):
+        return f"[{self.time}, {self.peer}, '{EVENT_NAMES[self.kind]}', {self.sender}, {self.obj}]"
+
+# Single threaded priority queue of events, built on heapq
+# Events are ordered by time, and events with the same time in the order they were added (using a sequence number),
+# so that two events are never compared with each other
+
+class EventQueue:
+    __slots__=('heap','sequence')
+
+    def __init__(self):
+        self.heap=[]                                # Heap of (time, sequence number, event)
+        self.sequence=0                             # Sequence number of the next event added
+
+    # Adds an event to the queue
+    def put(self,event):
+        heapq.heappush(self.heap,(event.time,self.sequence,event))
+        self.sequence+=1
+
+    # Adds a list of events to the queue, in the same order as put on each of them
+    # A list at least as long as the queue is appended to the heap, which is then rebuilt in linear time
+    def put_many(self,events):
+        heap=self.heap
+        sequence=self.sequence
+        if len(events)>=len(heap):
+            heap.extend([(event.time,sequence+i,event) for i,event in enumerate(events)])
+            heapq.heapify(heap)
+        else:
+            push=heapq.heappush
+            for i,event in enumerate(events):
+                push(heap,(event.time,sequence+i,event))
+        self.sequence=sequence+len(events)
+
+    # Removes and returns the earliest event
+    def get(self):
+        return heapq.heappop(self.heap)[2]
+
+    def empty(self):
+        return not self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+# Calendar queue of events (R. Brown, 1988), with the same interface as EventQueue
+# Events are kept in an array of buckets ("days") of a fixed width of time, each bucket being a small heap, so that
+# adding and taking out an event costs O(1) on average instead of O(log n) for very large numbers of pending events
+# The number of buckets is doubled/halved as the queue grows/shrinks, and the bucket width is recomputed from the
+# separation of the earliest events. Events are taken out in exactly the same order as with EventQueue
+
+class CalendarQueue:
+    __slots__=('buckets','width','size','sequence','current')
+
+    def __init__(self):
+        self.buckets=[[],[]]                        # Buckets of (time, sequence number, event), each a heap
+        self.width=1.0                              # Width of time of each bucket
+        self.size=0                                 # Number of events in the queue
+        self.sequence=0                             # Sequence number of the next event added
+        self.current=0                              # Number of the bucket (counted from time 0, not wrapped around) of the last event taken out
+
+    # Adds an event to the queue
+    def put(self,event):
+        day=int(event.time/self.width)
+        heapq.heappush(self.buckets[day%len(self.buckets)],(event.time,self.sequence,event))
+        self.sequence+=1
+        self.size+=1
+
+        # Events earlier than the last one taken out move the calendar back
+        if day<self.current:
+            self.current=day
+
+        if self.size>2*len(self.buckets):
+            self.resize(2*len(self.buckets))
+
+    # Adds a list of events to the queue, in the same order as put on each of them, resizing the calendar once at the end
+    def put_many(self,events):
+        buckets=self.buckets
+        nbuckets=len(buckets)
+        width=self.width
+        sequence=self.sequence
+        current=self.current
+        push=heapq.heappush
+
+        for event in events:
+            day=int(event.time/width)
+            push(buckets[day%nbuckets],(event.time,sequence,event))
+            sequence+=1
+            if day<current:
+                current=day
+
+        self.sequence=sequence
+        self.size+=len(events)
+        self.current=current
+
+        if self.size>2*nbuckets:
+            nbuckets*=2
+            while self.size>2*nbuckets:
+                nbuckets*=2
+            self.resize(nbuckets)
+
+    # Removes and returns the earliest event
+    def get(self):
+        if self.size==0:
+            raise IndexError('get from an empty CalendarQueue')
+
+        buckets=self.buckets
+        nbuckets=len(buckets)
+        width=self.width
+
+        # Going through the buckets of one year, starting with the current day, until an event of that day is found
+        for day in range(self.current,self.current+nbuckets):
+            bucket=buckets[day%nbuckets]
+            if bucket and int(bucket[0][0]/width)==day:
+                self.current=day
+                return self.pop(bucket)
+
+        # No event in the next year, jumping directly to the earliest event
+        bucket=min((bucket for bucket in buckets if bucket),key=lambda bucket:bucket[0][:2])
+        self.current=int(bucket[0][0]/width)
+        return self.pop(bucket)
+
+    # Removes the earliest event of a bucket, shrinking the calendar if it has too many buckets
+    def pop(self,bucket):
+        event=heapq.heappop(bucket)[2]
+        self.size-=1
+        if len(self.buckets)>2 and self.size<len(self.buckets)//2:
+            self.resize(len(self.buckets)//2)
+        return event
+
+    # Rebuilds the calendar with a given number of buckets
+    def resize(self,nbuckets):
+        entries=[entry for bucket in self.buckets for entry in bucket]
+
+        # Width of a bucket is three times the average separation of the earliest events
+        earliest=heapq.nsmallest(25,entries)
+        if len(earliest)>1 and earliest[-1][0]>earliest[0][0]:
+            self.width=3*(earliest[-1][0]-earliest[0][0])/(len(earliest)-1)
+
+        self.buckets=[[] for i in range(nbuckets)]
+        for entry in entries:
+            self.buckets[int(entry[0]/self.width)%nbuckets].append(entry)
+        for bucket in self.buckets:
+            heapq.heapify(bucket)
+
+        self.current=int(earliest[0][0]/self.width) if earliest else 0
+
+    def empty(self):
+        return self.size==0
+
+    def __len__(self):
+        return self.size
+
+# Schedulers which can be selected for the simulation
+SCHEDULERS = {'heap':EventQueue,'calendar':CalendarQueue}
@@ -2,39 +2,193 @@ import argparse
 from queue import PriorityQueue
 import numpy as np
 import sys
-from copy import deepcopy
+from collections import OrderedDict
 
 
-class Block:
-    def __init__(self,prev_blk_id,blk_id,miner_id,owner,transactions,depth,time,balances):
-        self.blk_id=blk_id                          # ID of Block (generated randomly from uuid lib)
+# All classes use __slots__ instead of a __dict__ per object, since a long run creates a very large number of them
+
+class BlockBody:
+    __slots__=('blk_id','prev_blk_id','miner_id','transactions','checkpoint')
+    
+    def __init__(self,prev_blk_id,blk_id,miner_id,transactions,checkpoint=None):
+        self.blk_id=blk_id                          # ID of Block (allocated by block_ids, 0 is the genesis block)
         self.prev_blk_id=prev_blk_id                # ID of previous (parent) block
-        self.owner=owner                            # ID of Peer in whose blockchain this block is present
         self.miner_id=miner_id                      # ID of Peer which mined the block
         self.transactions=transactions              # List of transactions contained in the block
+        self.checkpoint=checkpoint                  # The balances of all Peers after including all transactions from the genesis block till this block, only stored every CHECKPOINT_INTERVAL blocks (None otherwise)
+
+# A block as present in the blockchain of one Peer. The body is shared by the copies of the block held by all Peers
+# (it is never modified after creation, except for storing the checkpoint once), only the metadata below is per Peer
+
+class Block:
+    __slots__=('body','owner','depth','time_of_arrival')
+    
+    def __init__(self,body,owner,depth,time):
+        self.body=body                              # Shared BlockBody with the contents of the block
+        self.owner=owner                            # ID of Peer in whose blockchain this block is present
         self.depth=depth                            # Depth of this block in the blockchain
         self.time_of_arrival=time                   # Time at which this block was received by the Owner
-        self.balances=balances.copy()               # The current balances of all Peers after including all transactions from the genesis block till this block (using .copy() to avoid assigning by reference which can lead to errors on modification)
+    
+    @property
+    def blk_id(self):
+        return self.body.blk_id
+    
+    @property
+    def prev_blk_id(self):
+        return self.body.prev_blk_id
+    
+    @property
+    def miner_id(self):
+        return self.body.miner_id
+    
+    @property
+    def transactions(self):
+        return self.body.transactions
+    
+    @property
+    def checkpoint(self):
+        return self.body.checkpoint
 
 class Transaction:
+    __slots__=('transaction_id','start','destination','coins','size')
+    
     def __init__(self,start,destination,coins,size,transaction_id):
-        self.transaction_id = transaction_id        # ID of transaction (generated randomly from uuid lib)
+        self.transaction_id = transaction_id        # ID of transaction (allocated by transaction_ids)
         self.start = start                          # ID of peer that sent the coins (if -1 then it is a coinbase transaction)
         self.destination = destination              # ID of peer that received the coins
         self.coins = coins                          # Number of coins involved in the transaction
         self.size = size                            # Size of transaction in Kilobits (by default 8000, since size = 1KB)
-        
+
+# Deterministic allocator of integer IDs for blocks and transactions
+# IDs are handed out in increasing order from start, so the same run always gets the same IDs, and IDs are cheap to compare and hash
+
+class IdAllocator:
+    __slots__=('next_id',)
+    
+    def __init__(self,start=0):
+        self.next_id=start                          # ID that will be handed out next
+    
+    # Returns a new ID
+    def __call__(self):
+        new_id=self.next_id
+        self.next_id+=1
+        return new_id
+
+# Pool of random variates drawn in large vectorized batches from a numpy Generator and handed out one at a time
+# A scalar call to the Generator costs far more than the number itself, so the hot paths (latency, inter-arrival times
+# of transactions and blocks) use this instead. The same seed and batch size always give the same sequence of numbers.
+
+class RandomPool:
+    __slots__=('generator','batch_size','exponentials','uniforms')
+    
+    def __init__(self,generator,batch_size=8192):
+        self.generator=generator                    # numpy Generator the batches are drawn from
+        self.batch_size=batch_size                  # Number of variates drawn in one batch
+        self.exponentials=[]                        # Remaining standard exponential variates of the current batch
+        self.uniforms=[]                            # Remaining uniform variates in [0,1) of the current batch
+    
+    # Exponential variate with the given scale (mean)
+    def exponential(self,scale=1.0):
+        if not self.exponentials:
+            self.exponentials=self.generator.standard_exponential(self.batch_size).tolist()
+        return self.exponentials.pop()*scale
+    
+    # List of a given number of standard exponential variates (scale 1), taken at once from the current batch
+    def standard_exponentials(self,count):
+        if len(self.exponentials)<count:
+            self.exponentials=self.generator.standard_exponential(max(self.batch_size,count)).tolist()
+        values=self.exponentials[-count:]
+        del self.exponentials[-count:]
+        return values
+    
+    # Array of exponential variates with the given array of scales, drawn at once from the Generator
+    def exponential_array(self,scales):
+        return self.generator.standard_exponential(len(scales))*scales
+    
+    # Uniform variate in [0,1)
+    def random(self):
+        if not self.uniforms:
+            self.uniforms=self.generator.random(self.batch_size).tolist()
+        return self.uniforms.pop()
+    
+    # Uniform variate in [low,high)
+    def uniform(self,low=0.0,high=1.0):
+        return low+(high-low)*self.random()
+    
+    # Random integer in [0,high)
+    def integers(self,high):
+        return int(self.random()*high)
+    
+    # Random choice of elements, only used while setting up the network, so it is passed on to the Generator
+    def choice(self,*args,**kwargs):
+        return self.generator.choice(*args,**kwargs)
+    
+    # Random permutation, only used while setting up the network, so it is passed on to the Generator
+    def permutation(self,*args,**kwargs):
+        return self.generator.permutation(*args,**kwargs)
+
+class Mempool:
+    __slots__=('transactions',)
+    
+    def __init__(self):
+        self.transactions=OrderedDict()             # Transactions that have yet to be included in a block, keyed by transaction ID in order of arrival
+    
+    # Adds a transaction at the end of the mempool, if not already present
+    def add(self,transaction):
+        if transaction.transaction_id not in self.transactions:
+            self.transactions[transaction.transaction_id]=transaction
+    
+    # Removes all the given transactions (e.g. the transactions of a validated block) from the mempool
+    def remove_block(self,transactions):
+        for transaction in transactions:
+            self.transactions.pop(transaction.transaction_id,None)
+    
+    # Removes the oldest num transactions from the mempool and returns them in order of arrival
+    def take(self,num):
+        taken=[]
+        for i in range(num):
+            taken.append(self.transactions.popitem(last=False)[1])
+        return taken
+    
+    # Adds back the given transactions (e.g. from blocks orphaned by a fork switch) at the start of the mempool, keeping their order
+    def readd(self,transactions):
+        for transaction in reversed(transactions):
+            if transaction.transaction_id not in self.transactions:
+                self.transactions[transaction.transaction_id]=transaction
+                self.transactions.move_to_end(transaction.transaction_id,last=False)
+    
+    def __len__(self):
+        return len(self.transactions)
+    
+    def __iter__(self):
+        return iter(self.transactions.values())
+    
+    def __contains__(self,transaction_id):
+        return transaction_id in self.transactions
+
 class Peer:
+    __slots__=('id','speed','power','received_transactions','seen_transactions','neighbors','left_transactions','cacheBlock','cached_blocks','received_blocks','block_index','chain_transactions','balance_cache','max_depth','mining_block','hashingpower','strategy','relay_queue','secret_chain','attacker_lead','secret_index','own_max_depth')
+    
     def __init__(self,peer_id,speed,power,hashingpower):
         self.id=peer_id                             # ID of Peer          
         self.speed=speed                            # Speed of Peer (whether 'fast' or 'slow')
         self.power=power                            # Power of peer (whether 'lowcpu' or 'highcpu')
         self.received_transactions=[]               # All transactions received by the peer till now
+        self.seen_transactions=set()                # IDs of all transactions in received_transactions, for constant time lookup
         self.neighbors=[]                           # IDs of all the neighbors of the Peer
-        self.left_transactions=[]                   # Transactions that have yet to be included in a block
-        self.cacheBlock=[]                          # Due to latency blocks can arrive in different order than expected, this is to store out of order received_block tasks
+        self.left_transactions=Mempool()            # Transactions that have yet to be included in a block
+        self.cacheBlock={}                          # Due to latency blocks can arrive in different order than expected, this maps the ID of a missing parent to the out of order received_block tasks of its children
+        self.cached_blocks=set()                    # IDs of all blocks in cacheBlock, for constant time lookup
         self.received_blocks=[]                     # List of all blocks received by the Peer
+        self.block_index={}                         # Maps the ID of every block in received_blocks to the Block object, for constant time lookup
+        self.chain_transactions=set()               # IDs of all transactions included in some block of received_blocks
+        self.balance_cache={}                       # Maps the ID of every validated block that has no validated child yet (a tip) to the balances of all Peers after it
         self.max_depth=0                            # Maximum depth of the blockchain tree of the Peer till now
+        self.mining_block=None                      # Block with maximum depth (earliest arrival on ties) in received_blocks, the block to be mined upon
         self.hashingpower=hashingpower              # Actual percentage of hashing power possessed by node in the network depending on whether 'highcpu' or 'lowcpu'
+        self.strategy=None                          # Strategy of the Peer (Honest, or the attack of the attacker node), set by the simulator
+        self.relay_queue=[]                         # Transactions waiting to be relayed to neighbors in the next batch, with the ID of the Peer each was received from
         self.secret_chain=[]                        # Only for attacking peers, gives the blocks (actually tasks) that have been generated by the attacker in secret
-        self.attacker_lead=0                        # Only for attacking peers, gives the total number of blocks by which the attacker chain leads currently
\ No newline at end of file
+        self.attacker_lead=0                        # Only for attacking peers, gives the total number of blocks by which the attacker chain leads currently
+        self.secret_index={}                        # Only for attacking peers, maps the ID of every block in secret_chain to the Block object
+        self.own_max_depth=0                        # Maximum depth of a block mined by the Peer itself, in received_blocks or secret_chain
\ No newline at end of file
@@ -0,0 +1,134 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import traceback
+import zlib
+from concurrent.futures import ProcessPoolExecutor , as_completed
+import numpy as np
+from simulator import Config , run_simulation
+from topology import TOPOLOGIES
+
+# Parameter sweep of the attack: runs the simulation of simulator.py for every combination of the attacker parameters given,
+# a number of times each (replicates) with different seeds, in a pool of processes, and gathers the MPU metrics (as written
+# to Ratios.out) of every run into one CSV file. Runs already in the file are skipped, so that an interrupted sweep can be resumed
+
+# Columns of the results file, the parameters of a run followed by its metrics (averaged over all peers)
+PARAMETERS = ['attackerpower','attackerconnections','attackerspeed','replicate','seed']
+METRICS = ['mpu_adversary','adversary_blocks','mpu_total']
+
+# Returns the seed of a run, which only depends on the base seed, the attacker parameters and the replicate number
+# (not on the other runs of the sweep), so that a run gets the same seed when the sweep is resumed or extended
+
+def run_seed(base_seed,attackerpower,attackerconnections,attackerspeed,replicate):
+    key=zlib.crc32(f"{attackerpower}/{attackerconnections}/{attackerspeed}".encode())
+    return int(np.random.SeedSequence(base_seed,spawn_key=(key,replicate)).generate_state(1)[0])
+
+# Runs a simulation (in the worker process, without writing any files) with the given parameters, and returns the row of
+# the results file. Parameters the simulation cannot be set up with (e.g. more attacker connections than peers) make
+# numpy raise a ValueError, in which case the traceback is written to stderr and the row has no metrics. Any other
+# exception is a bug, and is raised again in the main process by future.result()
+
+def run(options,attackerpower,attackerconnections,attackerspeed,replicate,seed):
+
+    row={'attackerpower':attackerpower,'attackerconnections':attackerconnections,'attackerspeed':attackerspeed,'replicate':replicate,'seed':seed}
+
+    try:
+        result=run_simulation(Config(attackerpower=attackerpower,attackerspeed=attackerspeed,attackerconnections=attackerconnections,seed=seed,**options))
+    except ValueError:
+        sys.stderr.write(f"Run failed: {row}\n{traceback.format_exc()}")
+        return row
+    metrics=np.array([result.ratios(i) for i in range(len(result.peer_list))])
+
+    for name,value in zip(METRICS,metrics.mean(axis=0)):
+        row[name]=float(value)
+    return row
+
+# Returns the keys (attacker parameters and replicate) of the runs already in the results file, failed runs are run again
+
+def completed_runs(file_name):
+    if not os.path.exists(file_name):
+        return set()
+    f=open(file_name,'r',newline='')
+    done={(float(row['attackerpower']),float(row['attackerconnections']),int(row['attackerspeed']),int(row['replicate'])) for row in csv.DictReader(f) if row['mpu_adversary']!=''}
+    f.close()
+    return done
+
+# Prints the mean and standard deviation of the metrics over the replicates of every combination of parameters in the results file
+
+def print_table(file_name):
+
+    f=open(file_name,'r',newline='')
+    rows=[row for row in csv.DictReader(f) if row['mpu_adversary']!='']
+    f.close()
+
+    groups={}
+    for row in rows:
+        groups.setdefault((float(row['attackerpower']),float(row['attackerconnections']),int(row['attackerspeed'])),[]).append([float(row[name]) for name in METRICS])
+
+    print("Power | Connections | Speed | Runs | MPU(adversary) | Adversary blocks | MPU(total)")
+    for key in sorted(groups):
+        metrics=np.array(groups[key])
+        mean=metrics.mean(axis=0)
+        std=metrics.std(axis=0)
+        columns=" | ".join(f"{mean[j]:.3f} +- {std[j]:.3f}" for j in range(len(METRICS)))
+        print(f"{key[0]:5g} | {key[1]:11g} | {key[2]:5d} | {len(metrics):4d} | {columns}")
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peers", help='number of peers',type=int,required=True)
+    parser.add_argument("--slow", help='percentage of slow nodes',type=float,required=True)
+    parser.add_argument("--lowcpu", help='percentage of low CPU nodes',type=float,required=True)
+    parser.add_argument("--meantransactiontime", help='mean time between arrival of transactions in ms',type=float,required=True)
+    parser.add_argument("--meanblocktime", help='mean time between arrival of blocks in ms',type=float,required=True)
+    parser.add_argument("--attackerpower", help='hashing powers with the attacker',type=float,nargs='+',required=True)
+    parser.add_argument("--attackerconnections", help='percentages of nodes the attacker is connected to',type=float,nargs='+',required=True)
+    parser.add_argument("--attackerspeed", help='whether the attacker is a fast node (1) or a slow node (0)',type=int,nargs='+',choices=[0,1],default=[1])
+    parser.add_argument("--replicates", help='number of runs of every combination of parameters, each with its own seed',type=int,default=1)
+    parser.add_argument("--seed", help='base seed, from which the seed of every run is derived',type=int,default=0)
+    parser.add_argument("--maxevents", help='number of events after which every simulation stops (default of simulator.py if not given)',type=int)
+    parser.add_argument("--topology", help='shape of the network (default of simulator.py if not given)',choices=list(TOPOLOGIES))
+    parser.add_argument("--workers", help='number of runs at the same time (number of cores if not given)',type=int)
+    parser.add_argument("--output", help='CSV file the results are written to, runs already in it are skipped',default='Sweep.csv')
+
+    args=parser.parse_args()
+
+    options={'peers':args.peers,'slow':args.slow,'lowcpu':args.lowcpu,'meantransactiontime':args.meantransactiontime,'meanblocktime':args.meanblocktime}
+    if args.maxevents is not None:
+        options['maxevents']=args.maxevents
+    if args.topology is not None:
+        options['topology']=args.topology
+
+    done=completed_runs(args.output)
+    runs=[(power,connections,speed,replicate) for power,connections,speed,replicate in
+          itertools.product(args.attackerpower,args.attackerconnections,args.attackerspeed,range(args.replicates))
+          if (power,connections,speed,replicate) not in done]
+
+    print(f"Runs: {len(runs)} ({len(done)} already in {args.output})")
+
+    # Every run is appended to the results file as soon as it finishes, so that nothing is lost if the sweep is interrupted
+    new_file=not os.path.exists(args.output)
+    f=open(args.output,'a',newline='')
+    writer=csv.DictWriter(f,fieldnames=PARAMETERS+METRICS)
+    if new_file:
+        writer.writeheader()
+
+    failed=0
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count()) as pool:
+        futures=[pool.submit(run,options,power,connections,speed,replicate,run_seed(args.seed,power,connections,speed,replicate))
+                 for power,connections,speed,replicate in runs]
+        for count,future in enumerate(as_completed(futures),1):
+            row=future.result()
+            writer.writerow(row)
+            f.flush()
+            if METRICS[0] not in row:
+                failed+=1
+            sys.stderr.write(f"{count}/{len(runs)}\n")
+
+    f.close()
+
+    if failed:
+        print(f"Failed runs: {failed} (written without metrics)")
+    print_table(args.output)
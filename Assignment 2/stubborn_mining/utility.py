@@ -1,68 +1,60 @@
-import numpy as np
-import uuid
-from structures import Block, Peer, Transaction
-from copy import deepcopy
+import sys
+from structures import Block, BlockBody, Peer, Transaction
+from scheduler import Event, EventKind
 
 
 MININGFEE = 50
 
+CHECKPOINT_INTERVAL = 64 # Number of blocks between two blocks that store the full balances of all Peers
+INVENTORY_ENTRY_SIZE = 288 # Size of the entry of a transaction in the inventory of a batch of transactions (36 bytes, a transaction being 8000)
+
+# All random numbers are drawn from rng, the random generator of the simulation, so that a run can be reproduced from its seed
+# IDs of new blocks and transactions are handed out by the allocators (IdAllocator) of the simulation, passed in the same way
+
 # Generation of a new transaction
-def transaction_generation(peer,block,meantransactiontime,current_time):
+def transaction_generation(peer,meantransactiontime,current_time,rng,transaction_ids):
     
-    inter_arrival_time = np.random.exponential(scale=meantransactiontime) # Generating the inter-arrival time between 2 transactions
+    inter_arrival_time = rng.exponential(scale=meantransactiontime) # Generating the inter-arrival time between 2 transactions
     
     # Randomly fixing the destination ID of Peer, ensuring that sender is not the same as destination
     dest=peer.id 
     
     while dest==peer.id:
-        dest=np.random.randint(len(block.balances))
+        dest=rng.integers(number_of_peers(peer))
         
     # Creating a transaction object with the parameters described above
     # Number of coins is taken as a random small amount
     # This pretty much ensures that balance never goes below 0 and that all transaction generated are valid
     
-    transaction=Transaction(peer.id,dest,np.random.random()*2,8000,uuid.uuid4())
-    
-    dump_transaction(transaction)
+    transaction=Transaction(peer.id,dest,rng.random()*2,8000,transaction_ids())
     
     # Task is generated in the correct format specified in simulator.py 
-    return ([current_time+inter_arrival_time,peer.id,'gen_transaction',transaction])
+    return Event(current_time+inter_arrival_time,peer.id,EventKind.GEN_TRANSACTION,peer.id,transaction)
     pass
 
+# Returns the number of peers in the network, which is the length of the balances stored in the genesis block (always the first received block)
+def number_of_peers(peer):
+    return len(peer.received_blocks[0].checkpoint)
+
 # Find the block with max depth and minimum timestamp of a Peer, that is to be mined upon
 def find_mining_block(peer):
-    block=None
-    max_depth=0
-    time_of_arrival=np.inf
-    
-    # Iterate over all blocks and find the block with max depth. If there is a tie for maximum depth, choose the block with least time of arrival
-    for blk in peer.received_blocks:
-        if blk.depth>max_depth:
-            max_depth=blk.depth
-            time_of_arrival=blk.time_of_arrival
-            block=blk
-        elif blk.depth==max_depth and blk.time_of_arrival<time_of_arrival:
-            time_of_arrival=blk.time_of_arrival
-            block=blk            
-    
-    return block
+    
+    # Maintained incrementally by add_block as blocks are added to the blockchain
+    return peer.mining_block
 
 # Generation of a new block 
 
-def block_generation(peer,meanblocktime,current_time):
+def block_generation(peer,meanblocktime,current_time,rng,block_ids,transaction_ids):
     
     # Generating the inter arrival time between 2 blocks
     
-    inter_arrival_time = np.random.exponential(scale=meanblocktime/peer.hashingpower)
+    inter_arrival_time = rng.exponential(scale=meanblocktime/peer.hashingpower)
     
-    # Finding the block in the chain that is to be mined upon
+    # Finding the block in the chain that is to be mined upon, as decided by the strategy of the Peer
+    # (the attacker node mines upon its secret chain)
     
-    if(peer.id==0 and peer.attacker_lead!=0):
-        prev_block = peer.secret_chain[-1][4]
-        prev_blk_id = prev_block.blk_id
-    else:
-        prev_block = find_mining_block(peer)
-        prev_blk_id = prev_block.blk_id
+    prev_block = peer.strategy.mining_block(peer)
+    prev_blk_id = prev_block.blk_id
     
     # Choosing a random number of transactions from the generated transactions with a cap of 999 (1 left for coinbase transaction)
     # Since the transactions are generated while keeping the balances >=0 for all nodes, all transactions are valid
@@ -70,346 +62,387 @@ def block_generation(peer,meanblocktime,current_time):
     # There are some theoretical edge cases where balance may become negative involving latency and different order of transactions
     # But such cases never occurred in any of our simulations with widely different parameters, hence taking it as an extremely low probability event.
     
-    number_of_transactions=min((int)(np.random.random()*len(peer.left_transactions)),999)
-    included_transactions = peer.left_transactions[:number_of_transactions]
-    
-    # Including coinbase transaction
+    number_of_transactions=min((int)(rng.random()*len(peer.left_transactions)),999)
+    included_transactions = peer.left_transactions.take(number_of_transactions)
     
-    included_transactions.append(Transaction(-1,peer.id,MININGFEE,8000,uuid.uuid4()))
+    # Including coinbase transaction (the included transactions have already been removed from left_transactions)
     
-    # Updating the left_transactions (Transactions to be included in a block)
-    peer.left_transactions=peer.left_transactions[number_of_transactions:]
+    included_transactions.append(Transaction(-1,peer.id,MININGFEE,8000,transaction_ids()))
     
     # Creating a block object with the parameters described above
     
-    block=Block(prev_blk_id,uuid.uuid4(),peer.id,peer.id,included_transactions,prev_block.depth+1,current_time+inter_arrival_time,[])
+    block=Block(BlockBody(prev_blk_id,block_ids(),peer.id,included_transactions),peer.id,prev_block.depth+1,current_time+inter_arrival_time)
     
     # Task is generated in the correct format specified in simulator.py 
     
-    return ([current_time+inter_arrival_time,peer.id,'gen_block',block])
+    return Event(current_time+inter_arrival_time,peer.id,EventKind.GEN_BLOCK,peer.id,block)
     pass
 
-# Returns delay latency between two nodes with IDs given by start and dest, for a packet of given size, and given rho as speed of light propagation delay
+# Adds a block to the blockchain of a given Peer object, keeping the block index, the IDs of included transactions
+# and the block to be mined upon in sync with received_blocks
+# Also keeps track of the maximum depth of a block mined by the Peer itself
 
-def latency(start,dest,size,rho):
+def add_block(peer,block):
+    peer.received_blocks.append(block)
+    peer.block_index[block.blk_id]=block
     
-    #Link speed between the two nodes in KiloBits per second
-    c=5000 
+    for transaction in block.transactions:
+        peer.chain_transactions.add(transaction.transaction_id)
     
-    if(start.speed=='fast' and dest.speed=='fast'):
-        c=100000 # Setting to 100 Mbps if both nodes are fast
+    # Updating the block to be mined upon. It is the block with max depth, and if there is a tie for maximum depth,
+    # the block with least time of arrival (the earlier added block on a tie in time as well)
+    tip=peer.mining_block
+    if tip is None or block.depth>tip.depth or (block.depth==tip.depth and block.time_of_arrival<tip.time_of_arrival):
+        peer.mining_block=block
+        
+        # If the new block does not extend the old one, the Peer has switched to a different fork
+        if tip is not None and block.prev_blk_id!=tip.blk_id:
+            switch_fork(peer,tip,block)
     
+    if(block.miner_id==peer.id):
+        peer.own_max_depth=max(peer.own_max_depth,block.depth)
+
+# Adds a block (actually task) to the secret chain of the attacker, keeping the secret index in sync with secret_chain
+
+def add_secret_block(peer,task):
+    peer.secret_chain.append(task)
+    peer.secret_index[task.obj.blk_id]=task.obj
     
-    d = np.random.exponential(scale=96/c) # Queuing Delay Calculation
-     
-    delay = rho+((size)/c)*1000+d # Total delay latency
-    return delay
+    if(task.obj.miner_id==peer.id):
+        peer.own_max_depth=max(peer.own_max_depth,task.obj.depth)
 
-# Returns depth of block with given block ID, if not found, returns -1
+# Removes the first num blocks (actually tasks) from the secret chain of the attacker, keeping the secret index in sync with secret_chain
 
-def find_block_depth(blk_id,peer):
+def remove_secret_blocks(peer,num):
+    for task in peer.secret_chain[:num]:
+        peer.secret_index.pop(task.obj.blk_id,None)
+    
+    peer.secret_chain=peer.secret_chain[num:]
+
+# Called when the block to be mined upon of a given Peer object switches from old_tip to new_tip on a different fork
+# Transactions of the blocks orphaned by the switch, that are not included in the new chain, are added back to left_transactions
 
+def switch_fork(peer,old_tip,new_tip):
+    
+    orphaned=[]
+    included=set()
+    
+    # Walking back from both tips till the common ancestor
+    while old_tip.blk_id!=new_tip.blk_id:
+        if old_tip.depth>=new_tip.depth:
+            orphaned.append(old_tip)
+            old_tip=get_block(old_tip.prev_blk_id,peer)
+        else:
+            for transaction in new_tip.transactions:
+                included.add(transaction.transaction_id)
+            new_tip=get_block(new_tip.prev_blk_id,peer)
+    
+    # Coinbase transactions are specific to a block, so they are never added back
+    transactions=[]
+    for block in reversed(orphaned):
+        for transaction in block.transactions:
+            if transaction.start!=-1 and transaction.transaction_id not in included:
+                transactions.append(transaction)
+    
+    peer.left_transactions.readd(transactions)
+
+# Returns the block with given block ID from the blockchain of a given Peer object, if not found, returns None
+
+def get_block(blk_id,peer):
+    
     # First it checks the already received blocks
-    for block in peer.received_blocks:
-        if block.blk_id == blk_id:
-            return block.depth
+    block=peer.block_index.get(blk_id)
+    if block is not None:
+        return block
     
     # If not found in received blocks, then check the secret chain
-    for task in peer.secret_chain:
-        if task[4].blk_id == blk_id:
-            return task[4].depth
+    return peer.secret_index.get(blk_id)
+
+# Returns depth of block with given block ID, if not found, returns -1
+
+def find_block_depth(blk_id,peer):
+
+    block=get_block(blk_id,peer)
+    if block is None:
+        return -1
     
-    return -1
+    return block.depth
+
+# Returns the size in kilobits of the message of a given task
+
+def message_size(task):
+    if(task.kind == EventKind.RECEIVED_TRANSACTION):
+        return task.obj.size
+    elif (task.kind == EventKind.RECEIVED_BLOCK):
+        return len(task.obj.transactions)*8000 # Since each transaction is of 1KB
+    elif (task.kind == EventKind.RECEIVED_TRANSACTIONS):
+        return batch_size(task.obj)
+    
+    # This will never happen because type of task can only be receiving of a block or a transaction
+    print("Illegal Task Type")
+    exit(50)
 
-# Broadcasts a given task from Peer object start to a Peer object dest
+# Broadcasts the given tasks (in order) from Peer object start to all its neighbors except sender (where they are received from), with
+# the delays of all its links computed at once from the LinkTable links for each task. Returns the new tasks of all of them in a
+# single list, task by task and in the order of start.neighbors, so that they can be added to the event queue at once
 
-def broadcast(task,start,dest,rho):
+def broadcast(tasks,start,sender,links,rng):
     
-    # Calculation of size of packet to be transmitted
-    size=0
-    if(task[2] == 'received_transaction'):
-        size = task[4].size
-    elif (task[2] == 'received_block'):
-        size = len(task[4].transactions)*8000 # Since each transaction is of 1KB
-    else:
-        # This will never happen because type of task can only be receiving of a block or a transaction
-        print("Illegal Task Type")
-        exit(50)
+    start_id=start.id
+    neighbors=start.neighbors
+    events=[]
+    
+    for task in tasks:
+        delays=links.delays(start_id,message_size(task),rng)
+        
+        # Creating a new task for every neighbor at time = current time + delay
+        # task.kind refers to type of task (received_block or received_transaction)
+        # ID of node from which message is received is start.id
+        # Details of Transaction/Block is in task.obj (can use reference here, because on processing we always create a new copy of Block and Transaction is same for different peers)
         
-    # Calculating the delay latency to find at what time the event is to be scheduled
-    delay = latency(start,dest,size,rho)
+        current_time=task.time
+        kind=task.kind
+        obj=task.obj
+        events.extend([Event(current_time+delay,dest,kind,start_id,obj) for dest,delay in zip(neighbors,delays) if dest!=sender])
     
-    # Creating a new task at time = current time + delay
-    # ID of node receiving the message is dest.id
-    # task[2] refers to type of task (received_block or received_transaction)
-    # ID of node from which message is received is start.id
-    # Details of Transaction/Block is in task[4] (can use reference here, because on processing we always create a new copy of Block and Transaction is same for different peers)
+    return events
+
+# Returns the size of the message of a batch of transactions (list of Transactions), an inventory of the batch and the transactions
+# Links carry any number of messages at once (a message is not delayed by the ones sent before it), so the transactions of a batch take
+# as long as the largest one, as the same transactions relayed one at a time would
+
+def batch_size(batch):
+    return INVENTORY_ENTRY_SIZE*len(batch)+max(transaction.size for transaction in batch)
+
+# Sends the transactions queued for relay in Peer object start (pairs of a transaction and the ID of the Peer it was received from)
+# to all its neighbors at current_time, as one message to every neighbor with the queued transactions not received from it,
+# with the delays of all its links computed at once from the LinkTable links. Returns the new tasks, in the order of start.neighbors
+
+def batch_broadcast(queue,start,current_time,links,rng):
     
-    newtask = [task[0]+delay, dest.id , task[2] , start.id , task[4]]
+    start_id=start.id
+    neighbors=start.neighbors
+    batches=[[transaction for transaction,sender in queue if sender!=dest] for dest in neighbors]
+    delays=links.batch_delays(start_id,[batch_size(batch) if batch else 0 for batch in batches],rng)
     
-    return newtask
+    return [Event(current_time+delay,dest,EventKind.RECEIVED_TRANSACTIONS,start_id,batch) for dest,delay,batch in zip(neighbors,delays,batches) if batch]
+
+# Returns the number of transactions received by some Peer, and the fraction of them received by a Peer on average
+
+def transaction_coverage(peer_list):
+    transactions=set()
+    for peer in peer_list:
+        transactions.update(peer.seen_transactions)
+    if not transactions:
+        return 0,1.0
+    return len(transactions),sum(len(peer.seen_transactions) for peer in peer_list)/(len(peer_list)*len(transactions))
+
+# Returns the fraction of the blocks mined in the simulation (received by some Peer) which are not on the longest chain
+
+def fork_rate(peer_list):
+    blocks=set()
+    for peer in peer_list:
+        blocks.update(peer.block_index)
+    mined=len(blocks)-1
+    if mined==0:
+        return 0.0
+    return 1-max(peer.max_depth for peer in peer_list)/mined
+
+# Adds a transaction to the received transactions of a given Peer object, keeping the set of seen transaction IDs in sync
+
+def add_transaction(peer,transaction):
+    peer.received_transactions.append(transaction)
+    peer.seen_transactions.add(transaction.transaction_id)
 
 # Checks if a transaction with a given ID exists in a given Peer object. If true, returns 1, else returns -1.
 
 def exists_transaction(transaction_id,peer):
 
     #Checking if a transaction exists or not
-    for transaction in peer.received_transactions:
-        if(transaction.transaction_id == transaction_id):
-            return 1
+    if transaction_id in peer.seen_transactions:
+        return 1
     return -1
 
 # Gets balance of all peers according to the Blockchain of a given Peer object till the block with given Block ID
+# Returns None if the Peer does not have the block
 def get_balance(peer,blk_id):
     
-    # First it checks the already received blocks
-    for block in peer.received_blocks:
-        if block.blk_id==blk_id:
-            return block.balances.copy()
-        
-    # If not found, then it checks the secret_chain
-    for task in peer.secret_chain:
-        if task[4].blk_id==blk_id:
-            return task[4].balances.copy()
-        
-    return []
+    # Balances at a tip of the blockchain are cached
+    balances=peer.balance_cache.get(blk_id)
+    if balances is not None:
+        return balances.copy()
     
-# Validates all transactions given in a block and updates the balances in the block and the list of left_transactions in the Peer object
+    block=get_block(blk_id,peer)
+    if block is None:
+        return None
+    
+    # Otherwise walk back till the nearest block storing a checkpoint, and replay the transactions of all blocks after it
+    blocks=[]
+    while block.checkpoint is None:
+        blocks.append(block)
+        block=get_block(block.prev_blk_id,peer)
+    
+    balances=block.checkpoint.copy()
+    for blk in reversed(blocks):
+        apply_transactions(balances,blk.transactions)
+    
+    return balances
+
+# Applies all transactions, in order, to the given balances of all peers and returns the IDs of peers whose balance was reduced
 
-def validate(block,peer):
+def apply_transactions(balances,transactions):
     
-    # Get balances of all peers till the previous block ID
-    balances = get_balance(peer,block.prev_blk_id).copy()
+    reduced=[]
     
-    # For each transaction, we update the balances of the peers
-    dump(block)
-    print(balances)
-    for transaction in block.transactions:
+    for transaction in transactions:
         
         if(transaction.start!=-1):
             # Deduct from Sender node only if not coinbase transaction
-            
             balances[transaction.start]-=transaction.coins
-        # dump(block)    
+            reduced.append(transaction.start)
         balances[transaction.destination]+=transaction.coins
     
+    return reduced
+    
+# Validates all transactions given in a block and updates the balances in the block and the list of left_transactions in the Peer object
+
+def validate(block,peer,interval=CHECKPOINT_INTERVAL):
+    
+    # Get balances of all peers till the previous block ID
+    # A block whose previous block is not in the blockchain of the Peer cannot be validated
+    balances = get_balance(peer,block.prev_blk_id)
+    if balances is None:
+        return False
+    
+    # For each transaction, we update the balances of the peers
+    reduced = apply_transactions(balances,block.transactions)
+    
     # If ever balance is 0, validation has failed
-    for bal in balances:
-        if bal<0:
+    # Balances after the previous block are all valid, so only the reduced ones need to be checked
+    for i in reduced:
+        if balances[i]<0:
             return False
-        
-    # Updating balances in the current block
-    block.balances=balances.copy()
-
-    # Only transactions that are a left to be included and not included in the current block are in left_transactions
-    not_present=[]
     
-    for transaction in peer.left_transactions:
-        if transaction not in block.transactions:
-            not_present.append(transaction)
+    # Storing the balances in the current block if it is a checkpoint
+    # Balances only depend on the chain till the block, so the first Peer to validate it stores them for all
+    if block.depth%interval==0 and block.body.checkpoint is None:
+        block.body.checkpoint=balances
     
-    peer.left_transactions=not_present
+    # The current block is now a tip in place of the previous block
+    peer.balance_cache.pop(block.prev_blk_id,None)
+    peer.balance_cache[block.blk_id]=balances
+
+    # Only transactions that are a left to be included and not included in the current block are in left_transactions
+    peer.left_transactions.remove_block(block.transactions)
     
     return True
 
 # Finds the maximum depth of a block that was mined by the same node itself
 # Used when the attacker tries to find if a block is to be dropper
 def find_own_max_depth(peer):
-    max_depth=0
-    
-    # First iterate over all received_blocks
-    for block in peer.received_blocks:
-        if(block.miner_id==peer.id):
-            max_depth=max(max_depth,block.depth)
     
-    # Then iterate over blocks in secret_chain
-    for task in peer.secret_chain:
-        if(task[4].miner_id==peer.id):
-            max_depth=max(max_depth,task[4].depth)
-    
-    return max_depth
+    # Maintained incrementally by add_block and add_secret_block
+    return peer.own_max_depth
 
 # Similar to validate but we don't update any parameters about the block
 def validate_not_update(block,peer):
     
     # Get balances of all peers till the previous block ID
-    balances = get_balance(peer,block.prev_blk_id).copy()
+    # A block whose previous block is not in the blockchain of the Peer cannot be validated
+    balances = get_balance(peer,block.prev_blk_id)
+    if balances is None:
+        return False
     
     # For each transaction, we update the balances of the peers
-    for transaction in block.transactions:
-        
-        if(transaction.start!=-1):
-            # Deduct from Sender node only if not coinbase transaction
-            balances[transaction.start]-=transaction.coins
-        # dump_transaction(transaction)
-        # print(balances)
-        # dump(block)
-        balances[transaction.destination]+=transaction.coins
+    reduced = apply_transactions(balances,block.transactions)
     
     # If ever balance is 0, validation has failed
-    for bal in balances:
-        if bal<0:
+    for i in reduced:
+        if balances[i]<0:
             return False
     
     return True
     
 # Adding the blocks that have been cached back into the blockchain
 
-# block is the most recent addition to the blockchain, task_list is the list of tasks, and peer_list is an array of all the Peer objects
-def add_cache(task_list,peer_list,peer,block,rho,current_time):
+# block is the most recent addition to the blockchain, simulation is the running Simulation (which holds the event queue
+# and the list of all the Peer objects), and current_time is the time of the task being processed
+def add_cache(simulation,peer,block,current_time):
     
-    check=0
-    rem_task=None
-    # Iterating over all tasks that have been cached
+    # Worklist of added blocks whose cached children are still to be added
+    # The children of a block are added in the order they were cached, and then the chains on them are followed,
+    # the last added child first (the same order as recursing on every added block)
     
-    for nexttask in peer.cacheBlock:
-        rem_task=nexttask
-        if nexttask[4].prev_blk_id != block.blk_id:
-            # On not finding a block that comes next in chain, skip
-            continue
-        
-        # When we find a block that comes next in chain
-        
-        # Update the depth of the cached block
-        nexttask[4].depth=block.depth+1
+    worklist=[block]
+    
+    while worklist:
+        block=worklist.pop()
         
-        # Validating the arrived block
+        # Cached tasks whose parent is this block, if any
+        tasks=peer.cacheBlock.pop(block.blk_id,None)
+        if tasks is None:
+            continue
         
-        if(validate(nexttask[4],peer)):
+        for nexttask in tasks:
+            peer.cached_blocks.discard(nexttask.obj.blk_id)
             
-            #First, max_depth and received_blocks are updated
+            # Update the depth of the cached block
+            nexttask.obj.depth=block.depth+1
             
-            peer.max_depth=max(peer.max_depth,nexttask[4].depth) # Updating the maximum depth of the Peer Object
-            peer.received_blocks.append(nexttask[4]) # Appending the new block to the list of blocks
+            # Validating the arrived block
+            # An invalid block is only dropped from the cache, ensuring that this block (and any chain on it) will never be considered again
             
-            # Broadcast to neighbors, except where it is received from
-            # Broadcast only if not the attacker node
-            # This is to be done only if the node is honest
-            
-            # The process if it is an attacker node follows similar to what is there in simulator.py
-            if(peer.id!=0):
-                for adjacent in peer.neighbors:
-                    if adjacent == nexttask[3]:
-                        continue
-                    ntask = broadcast(nexttask,peer,peer_list[adjacent],rho)
-                    task_list.put(ntask)
-                    print("Added only:- ",ntask)
-            elif (nexttask[4].miner_id!=0):
-                
-                # If attacker lead is greater than or equal to 2,
-                # the attacker node, broadcasts exactly one node,
-                # keeping the rest of the chain secret.
+            if(validate(nexttask.obj,peer)):
                 
-                # Obviously it does not broadcast the honest node received
-                
-                # Broadcasting the secret node to neighbors
-                
-                if peer.attacker_lead>=2:
-                    for adjacent in peer_list[nexttask[1]].neighbors:
-                        if adjacent == nexttask[3]:
-                            continue
-                        peer_list[nexttask[1]].secret_chain[0][0]=current_time
-                        ntask = broadcast(peer.secret_chain[0],peer,peer_list[adjacent],rho)
-                        task_list.put(ntask)
-                        print("Added only:- ",ntask)
-                        
-                    # The attacker lead is updated
-                    peer.attacker_lead-=1
-
-                    # Added the secret block to list of received blocks
-                    peer.received_blocks.append(peer.secret_chain[0][4])    
-                    
-                    # Updated the max_depth
-                    peer.max_depth=max(peer.max_depth,peer.secret_chain[0][4].depth)                         
-                    
-                    # Removed the block from the secret chain
-                    peer.secret_chain=peer.secret_chain[1:]
-
+                # Adding the block to the blockchain and broadcasting it, as decided by the strategy of the Peer
+            # (for the attacker node, this is the same as for a received block in simulator.py)
+                peer.strategy.accept_block(simulation,peer,nexttask,nexttask.obj,current_time)
+                simulation.accepted(peer,nexttask.obj,current_time)
                 
-                elif peer.attacker_lead==1:
-                    for adjacent in peer.neighbors:
-                        if adjacent == nexttask[3]:
-                            continue
-                        peer.secret_chain[1][0]=nexttask[0]
-                        ntask = broadcast(peer.secret_chain[1],peer,peer_list[adjacent],rho)
-                        task_list.put(ntask)
-                        print("Added only:- ",ntask)
-
-                    # Updating attacker lead
-                    peer.attacker_lead=0
-                    # Added secret block to list of received blocks
-                    peer.received_blocks.append(peer.secret_chain[0][4])
-                    
-                    # Updated the max_depth
-                    peer.max_depth=max(peer.max_depth,peer.secret_chain[0][4].depth)
-                    
-                    # Empty the secret_chain of the attacker node
-                    peer.secret_chain=[]
-            else:
-                # Finally if the attacker node receives a block mined by itself
-                # Then add this block (actually task) to the secret chain
-                
-                # Updating the value of task[4] so that the value of block depth
-                # and other updated parameters are saved in the block
-      
-                ntask=deepcopy(nexttask)
-                peer.secret_chain.append(ntask)
-                peer.attacker_lead+=1
-                pass
-
-            # Checking if there are any other blocks to add from cache
-            check=1
-            break
-            add_cache(task_list,peer_list,peer,block,rho)
-            return add_cache(task_list,peer_list,peer,nexttask[4],rho)
-        else:
-            # Setting previous block id to a non existent block, ensuring that this block will never be considered again
-            nexttask[4].prev_blk_id=-2
-            check=2
-            break
-            
-            # Checking if there are any other blocks that build upon the current block
-            return add_cache(task_list,peer_list,peer,block,rho)
-    
-    
-    # check=0 represents that there are no more cache blocks to be added
-    # Function is terminated here
-    
-    # check=1 represents that there might be a chain on both the blocks added
-    # Hence a recursive call is done on both blocks
-    
-    # check=2 represents that the block was invalidated and hence this cannot be
-    # a part of the chain and hence the recursive call is done on only the original block
-    
-    if(check==0):
-        return False
-    elif(check==1):
-        peer.cacheBlock.remove(rem_task)
-        add_cache(task_list,peer_list,peer,block,rho,current_time)
-        return add_cache(task_list,peer_list,peer,nexttask[4],rho,current_time)
-    else:
-        peer.cacheBlock.remove(rem_task)
-        return add_cache(task_list,peer_list,peer,block,rho,current_time)
-        
-    return False
+                # Checking if there are any other blocks to add from cache on this block
+                worklist.append(nexttask.obj)
 
 # Check if a transaction exists in a received block
 
 def exists_transaction_in_blocks(transaction,peer):
     
-    for blk in peer.received_blocks:
-        if transaction in blk.transactions:
-            return True
-    return False
+    # Checked by ID, since every Peer keeps its own copy of a received transaction
+    return transaction.transaction_id in peer.chain_transactions
 
 # Check if a block exists in cache
 
 def exists_in_cache(blk_id,peer):
-    for task in peer.cacheBlock:
-        if task[4].blk_id == blk_id:
-            return True
-        
-    return False
+    return blk_id in peer.cached_blocks
+
+# Caches a received_block task whose parent has not been received yet, till the parent is added to the blockchain
+
+def cache_block(task,peer):
+    peer.cacheBlock.setdefault(task.obj.prev_blk_id,[]).append(task)
+    peer.cached_blocks.add(task.obj.blk_id)
+
+# Returns the size in bytes of a Transaction object, with its coin amount and its ID
+
+def transaction_size(transaction):
+    return sys.getsizeof(transaction)+sys.getsizeof(transaction.coins)+sys.getsizeof(transaction.transaction_id)
+
+# Returns the memory used by the transaction structures of a given Peer object, as (entries, bytes of the container,
+# bytes of the elements) for each. The elements (transaction IDs, and Transaction objects with their IDs) are counted
+# in full, though they are shared with the Transaction objects and with the other Peers holding the same transactions
+
+def transaction_memory(peer):
+    mempool=peer.left_transactions
+    return {
+        'received_transactions': (len(peer.received_transactions),sys.getsizeof(peer.received_transactions),sum(transaction_size(transaction) for transaction in peer.received_transactions)),
+        'seen_transactions': (len(peer.seen_transactions),sys.getsizeof(peer.seen_transactions),sum(sys.getsizeof(transaction_id) for transaction_id in peer.seen_transactions)),
+        'chain_transactions': (len(peer.chain_transactions),sys.getsizeof(peer.chain_transactions),sum(sys.getsizeof(transaction_id) for transaction_id in peer.chain_transactions)),
+        'left_transactions': (len(mempool),sys.getsizeof(mempool)+sys.getsizeof(mempool.transactions),sum(transaction_size(transaction) for transaction in mempool)),
+    }
+
+# Printing function for memory usage of a Peer
+def dump_memory(peer):
+    print("Peer ID: ",peer.id)
+    for name,(entries,container,elements) in transaction_memory(peer).items():
+        print(f"{name}: {entries} entries, {container} bytes, with the elements {container+elements} bytes")
 
 # Printing function for debugging purposes
 def dump_transaction(ele):
@@ -436,7 +469,7 @@ def dump(block):
     dump_transactions(block.transactions)
     print("Depth: ",block.depth)
     print("Arrival Time: " ,block.time_of_arrival)
-    print("Balances: ",block.balances)
+    print("Checkpoint: ",block.checkpoint)
     
     
 def dump_peer(peer):
@@ -445,5 +478,5 @@ def dump_peer(peer):
     print("Power: ",peer.power)
     print("Hashing Power: ",peer.hashingpower)
     print("Max Depth: ",peer.max_depth)
-    print("Balances: ",peer.attacker_lead)
+    print("Attacker Lead: ",peer.attacker_lead)
     
\ No newline at end of file